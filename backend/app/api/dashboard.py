@@ -1,64 +1,114 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, Response
+from fastapi.responses import StreamingResponse
+import asyncio
 from app.models.user import UserDB
-from app.models.feedback import FeedbackDB
+from app.models.feedback import FeedbackDB, FeedbackTimelineView, FeedbackAnalyticsView
 from collections import defaultdict
-from datetime import datetime, timedelta
-from typing import List, Literal, Optional
-from app.models.team import TeamDB
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Dict, List, Literal, Optional
+from app.utils.team_cache import team_cache, TeamSnapshot
+from app.utils.etag import make_etag, not_modified, feedback_version
 from pydantic import BaseModel
+from app.utils.loaders import UserLoader, get_user_loader
+from app.utils.auth import CurrentUser, get_current_user, require_role
+from app.utils.pagination import encode_cursor, keyset_filter
+from app.utils.periods import Granularity, window_start, period_expression, period_key, month_starts
+from app.utils.rollups import get_rollup
+from app.models.rollup import DashboardRollupDB
+from app.core.database import analytics_collection, analytics_aggregate
+from app.models.archive import ArchivedFeedbackDB
+from app.utils.archive import union_archive
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
 # feedback-count given/recieved
 @router.get("/feedback-count", response_model=dict)
-async def get_feedback_count(email: str = Query(...)):
-    user = await UserDB.find_one(UserDB.email == email)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
+async def get_feedback_count(request: Request, response: Response, user: CurrentUser = Depends(get_current_user)):
     if user.role == "manager":
-        count = await FeedbackDB.find(FeedbackDB.created_by_email == user.email).count()
+        count = (await get_rollup(user.org_id, user.email, user.role, secondary_ok=True)).given.total
         label = "Feedbacks Given"
     elif user.role == "employee":
-        count = await FeedbackDB.find(FeedbackDB.employee_email == user.email).count()
+        count = (await get_rollup(user.org_id, user.email, user.role, secondary_ok=True)).received.total
         label = "Feedbacks Received"
     else:
         raise HTTPException(status_code=400, detail="Invalid role")
 
+    cached = not_modified(request, response, make_etag("feedback-count", user.email, count))
+    if cached:
+        return cached
+
     return {"count": count, "label": label}
 
+async def _sentiment_buckets(org_id: str, email: str, granularity: Granularity, start_date: datetime):
+    # filter, bucket and count in mongo so only window x 3 numbers come back.
+    # long week windows can reach back into the archive, both sides are indexed
+    pipeline = [
+        *union_archive({"org_id": org_id, "created_by_email": email, "created_at": {"$gte": start_date}}),
+        {"$group": {
+            "_id": {
+                "period": period_expression(granularity),
+                "sentiment": {"$ifNull": ["$sentiment", "neutral"]},
+            },
+            "count": {"$sum": 1},
+        }},
+    ]
+    buckets = await analytics_aggregate(FeedbackDB, pipeline)
+    return [(b["_id"]["period"], b["_id"]["sentiment"], b["count"]) for b in buckets]
+
+async def _sentiment_buckets_from_rollups(org_id: str, email: str, granularity: Granularity, start_date: datetime, now: datetime):
+    # monthly rollups answer month and quarter windows with one indexed read
+    months = {month.strftime("%Y-%m"): month for month in month_starts(start_date, now)}
+    docs = await analytics_collection(DashboardRollupDB).find({
+        "org_id": org_id,
+        "user_email": email,
+        "role": "manager",
+        "period": {"$in": list(months)}
+    }).to_list(None)
+    rollups = [DashboardRollupDB.model_validate(doc) for doc in docs]
+
+    return [
+        (period_key(granularity, months[rollup.period]), sentiment, count)
+        for rollup in rollups
+        for sentiment, count in rollup.given.sentiment.items()
+        if count
+    ]
+
 # sentiment-trends for manager only
 @router.get("/sentiment-trends", response_model=dict)
-async def sentiment_trends(email: str = Query(...)):
-    user = await UserDB.find_one(UserDB.email == email)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
+async def sentiment_trends(
+    request: Request,
+    response: Response,
+    window: int = Query(6, ge=1, le=104),
+    granularity: Granularity = Query("month"),
+    user: CurrentUser = Depends(get_current_user)
+):
     if user.role != "manager":
         raise HTTPException(status_code=403, detail="Only managers can access sentiment trends")
 
-    feedbacks = await FeedbackDB.find(FeedbackDB.created_by_email == email).to_list()
-
-    # Group sentiment by month (last 6 months)
-    trends = defaultdict(lambda: {"positive": 0, "neutral": 0, "negative": 0})
-
     now = datetime.utcnow()
-    start_date = now.replace(day=1) - timedelta(days=150)  # 5 months + current month
+    start_date = window_start(granularity, window, now)
 
-    for fb in feedbacks:
-        if fb.created_at is None:
-            continue
-
-        if fb.created_at < start_date:
-            continue
+    version = await feedback_version(
+        user.org_id, user.email, user.role, {"org_id": user.org_id, "created_by_email": user.email}, secondary_ok=True
+    )
+    cached = not_modified(request, response, make_etag("sentiment-trends", user.email, granularity, start_date, version))
+    if cached:
+        return cached
 
-        month_str = fb.created_at.strftime("%Y-%m")  # e.g., '2025-06'
-        sentiment = fb.sentiment or "neutral"  # fallback
-        trends[month_str][sentiment] += 1
+    trends = defaultdict(lambda: {"positive": 0, "neutral": 0, "negative": 0})
+    if granularity == "week":
+        buckets = await _sentiment_buckets(user.org_id, user.email, granularity, start_date)
+    else:
+        buckets = await _sentiment_buckets_from_rollups(user.org_id, user.email, granularity, start_date, now)
+    for period, sentiment, count in buckets:
+        trends[period][sentiment] += count
 
-    # Sort by month
+    # Sort by period
     sorted_data = sorted(trends.items())
-    labels = [month for month, _ in sorted_data]
+    labels = [period for period, _ in sorted_data]
     positive = [counts["positive"] for _, counts in sorted_data]
     neutral = [counts["neutral"] for _, counts in sorted_data]
     negative = [counts["negative"] for _, counts in sorted_data]
@@ -77,31 +127,40 @@ class TeamMemberDTO(BaseModel):
     email: str
     role: str
 
-@router.get("/team-members", response_model=List[TeamMemberDTO])
-async def get_team_members(user_email: str = Query(...)):
-    user = await UserDB.find_one(UserDB.email == user_email)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
+async def _find_team(user: CurrentUser) -> TeamSnapshot:
     # find the team this user belongs to
-    team = await TeamDB.find_one({ "$or" : [{"member_emails": user.email}, {"manager_email": user.email}]})
+    team = (await team_cache.lookup(user.org_id, user.email)).team
     if not team:
         raise HTTPException(status_code=404, detail="User is not part of any team")
+    return team
 
+async def _team_member_dtos(user: CurrentUser, team: TeamSnapshot) -> List[TeamMemberDTO]:
     # get all member and manager emails
-    all_emails = list(set(team.member_emails + [team.manager_email]))
-    all_emails = filter(lambda email: email != user_email, all_emails)
-    users = await UserDB.find({"email": {"$in": all_emails}}).to_list()
+    all_emails = list(set(team.member_emails + (team.manager_email,)))
+    all_emails = [email for email in all_emails if email != user.email]
+    users = await analytics_collection(UserDB).find(
+        {"org_id": user.org_id, "email": {"$in": all_emails}}, {"_id": 0, "name": 1, "email": 1, "role": 1}
+    ).to_list(None)
 
     return [
         TeamMemberDTO(
-            name=member.name,
-            email=member.email,
-            role=member.role
+            name=member["name"],
+            email=member["email"],
+            role=member["role"]
         )
         for member in users
     ]
 
+@router.get("/team-members", response_model=List[TeamMemberDTO])
+async def get_team_members(request: Request, response: Response, user: CurrentUser = Depends(get_current_user)):
+    team = await _find_team(user)
+
+    cached = not_modified(request, response, make_etag("team-members", user.email, team))
+    if cached:
+        return cached
+
+    return await _team_member_dtos(user, team)
+
 class FeedbackTimelineDTO(BaseModel):
     id: str
     creator: str  
@@ -109,35 +168,38 @@ class FeedbackTimelineDTO(BaseModel):
     sentiment: Optional[Literal["positive", "neutral", "negative"]] = None
     preview: str
 @router.get("/feedback-timeline", response_model=List[FeedbackTimelineDTO])
-async def get_feedback_timeline(email: str = Query(...)):
-    user = await UserDB.find_one(UserDB.email == email)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+async def get_feedback_timeline(
+    include_archived: bool = Query(False),
+    user: CurrentUser = Depends(get_current_user),
+    users: UserLoader = Depends(get_user_loader)
+):
     if user.role == "manager":
         raise HTTPException(status_code=400, detail="Manager's can't access feedback timeline")
 
-    feedbacks = await FeedbackDB.find({
-        "employee_email": email,
+    match = {
+        "org_id": user.org_id,
+        "employee_email": user.email,
         "status": {"$in": ["submitted", "acknowledged"]}
-    }).sort("-created_at").to_list()
+    }
+    stages = union_archive(match) if include_archived else [{"$match": match}]
+    feedbacks = await analytics_aggregate(
+        FeedbackDB, stages + [{"$sort": {"created_at": -1}}], projection_model=FeedbackTimelineView
+    )
+
+    await users.load_many(fb.created_by_email for fb in feedbacks if not fb.is_anon)
 
     timeline = []
     for fb in feedbacks:
         creator_name = "Anonymous"
         if not fb.is_anon:
-            creator = await UserDB.find_one(UserDB.email == fb.created_by_email)
-            creator_name = creator.name if creator else "Unknown"
-
-        preview = (fb.strengths or "")[:60]
-        if len(preview) == 60:
-            preview += "..."
+            creator_name = users.name(fb.created_by_email, default="Unknown")
 
         timeline.append(FeedbackTimelineDTO(
             id=str(fb.id),
             creator=creator_name,
             updated_at=fb.updated_at,
             sentiment=fb.sentiment,
-            preview=preview
+            preview=fb.preview
         ))
 
     return timeline
@@ -150,37 +212,246 @@ class FeedBackAllAnalyticsDTO(BaseModel):
     tags: Optional[List[str]]
     created_at: Optional[datetime]
 
-@router.get("/all-analytics", response_model=List[FeedBackAllAnalyticsDTO])
-async def get_all_analytics(user_email: str):
-    user = await UserDB.find_one(UserDB.email == user_email)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
+class EmployeeSentimentDTO(BaseModel):
+    email: str
+    name: str
+    total: int
+    positive: int
+    neutral: int
+    negative: int
+
+class FeedbackAnalyticsDTO(BaseModel):
+    total: int
+    status: Dict[str, int]
+    sentiment: Dict[str, int]
+    tags: Dict[str, int]
+    employees: List[EmployeeSentimentDTO]
+    items: List[FeedBackAllAnalyticsDTO]
+    next_cursor: Optional[str] = None
+
+ANALYTICS_TAG_FACETS = 50
+# sentiment only counts once the feedback has actually been sent
+SENT = {"$in": ["$status", ["submitted", "acknowledged"]]}
+
+def _employee_name_lookup(org_id: str) -> List[dict]:
+    # names come from users rather than the current team, so feedback to
+    # someone who has since left still resolves
+    return [
+        {"$lookup": {
+            "from": UserDB.Settings.name,
+            "let": {"email": "$employee_email"},
+            "pipeline": [
+                {"$match": {"$expr": {"$and": [{"$eq": ["$org_id", org_id]}, {"$eq": ["$email", "$$email"]}]}}},
+                {"$project": {"_id": 0, "name": 1}},
+            ],
+            "as": "employee",
+        }},
+        {"$addFields": {"employee_name": {"$ifNull": [{"$arrayElemAt": ["$employee.name", 0]}, "Unknown"]}}},
+        {"$project": {"employee": 0}},
+    ]
+
+def _sentiment_count(sentiment: str) -> dict:
+    return {"$sum": {"$cond": [{"$and": [SENT, {"$eq": ["$sentiment", sentiment]}]}, 1, 0]}}
+
+def _analytics_pipeline(org_id: str, email: str, include_archived: bool) -> List[dict]:
+    facets = {
+        "status": [{"$group": {"_id": "$status", "count": {"$sum": 1}}}],
+        "sentiment": [
+            {"$match": {"status": {"$in": ["submitted", "acknowledged"]}, "sentiment": {"$ne": None}}},
+            {"$group": {"_id": "$sentiment", "count": {"$sum": 1}}},
+        ],
+        "tags": [
+            {"$unwind": "$tags"},
+            {"$group": {"_id": "$tags", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}},
+            {"$limit": ANALYTICS_TAG_FACETS},
+        ],
+        "employees": [
+            {"$group": {
+                "_id": "$employee_email",
+                "total": {"$sum": 1},
+                "positive": _sentiment_count("positive"),
+                "neutral": _sentiment_count("neutral"),
+                "negative": _sentiment_count("negative"),
+            }},
+            {"$addFields": {"employee_email": "$_id"}},
+            *_employee_name_lookup(org_id),
+            {"$sort": {"_id": 1}},
+        ],
+    }
+    match = {"org_id": org_id, "created_by_email": email}
+    stages = union_archive(match) if include_archived else [{"$match": match}]
+    return stages + [{"$facet": facets}]
+
+def _analytics_page_pipeline(org_id: str, email: str, cursor: Optional[str], limit: int, include_archived: bool) -> List[dict]:
+    # the raw list, keyset-paged like /feedback/get-all. It stays out of the
+    # $facet, where the sort couldn't use the (org_id, created_by_email,
+    # updated_at, _id) index and every page would sort the whole history
+    match = {"org_id": org_id, "created_by_email": email}
+    if cursor:
+        match = {"$and": [match, keyset_filter(cursor)]}
+    page = [{"$sort": {"updated_at": -1, "_id": -1}}, {"$limit": limit + 1}]
+    stages = union_archive(match, page) + page if include_archived else [{"$match": match}, *page]
+    return stages + [{"$project": FeedbackAnalyticsView.Settings.projection}, *_employee_name_lookup(org_id)]
+
+@router.get("/all-analytics", response_model=FeedbackAnalyticsDTO)
+async def get_all_analytics(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(50, ge=0, le=200),
+    include_archived: bool = Query(False),
+    user: CurrentUser = Depends(get_current_user)
+):
     if user.role != "manager":
         raise HTTPException(status_code=403, detail="User is not a manager")
 
-    team = await get_team_members(user_email)
-
-    team_map = {}
-
-    for t in team:
-        team_map[t.email] = t
-    
-    raw_feedbacks = await FeedbackDB.find(FeedbackDB.created_by_email == user.email).to_list()
-
-    dto_list = []
-
-    for fb in raw_feedbacks:
-        dto = FeedBackAllAnalyticsDTO(
-            id=str(fb.id),
-            employee_name=team_map[fb.employee_email].name,
-            sentiment=fb.sentiment,
-            status=fb.status,
-            tags=fb.tags,
-            created_at=fb.created_at
-        )
-
-        dto_list.append(dto)
-
-    return dto_list
+    version = await feedback_version(
+        user.org_id, user.email, user.role, {"org_id": user.org_id, "created_by_email": user.email}, secondary_ok=True
+    )
+    cached = not_modified(request, response, make_etag("all-analytics", user.email, cursor, limit, include_archived, version))
+    if cached:
+        return cached
+
+    # counts, per-employee breakdown and names in one aggregation, the raw
+    # page in an indexed one alongside it
+    facets = analytics_aggregate(FeedbackDB, _analytics_pipeline(user.org_id, user.email, include_archived))
+    if limit:
+        page = analytics_aggregate(FeedbackDB, _analytics_page_pipeline(user.org_id, user.email, cursor, limit, include_archived))
+        results, rows = await asyncio.gather(facets, page)
+    else:
+        results, rows = await facets, []
+    result = results[0]
+    status = {b["_id"]: b["count"] for b in result["status"]}
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].get("updated_at"), rows[-1]["_id"])
+
+    return FeedbackAnalyticsDTO(
+        total=sum(status.values()),
+        status=status,
+        sentiment={b["_id"]: b["count"] for b in result["sentiment"]},
+        tags={b["_id"]: b["count"] for b in result["tags"]},
+        employees=[
+            EmployeeSentimentDTO(
+                email=e["_id"],
+                name=e["employee_name"],
+                total=e["total"],
+                positive=e["positive"],
+                neutral=e["neutral"],
+                negative=e["negative"]
+            )
+            for e in result["employees"]
+        ],
+        items=[
+            FeedBackAllAnalyticsDTO(
+                id=str(row["_id"]),
+                employee_name=row["employee_name"],
+                sentiment=row.get("sentiment"),
+                status=row["status"],
+                tags=row.get("tags"),
+                created_at=row.get("created_at")
+            )
+            for row in rows
+        ],
+        next_cursor=next_cursor
+    )
+
+
+
+# export for HR: streams every feedback in scope as NDJSON or CSV
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FIELDS = [
+    "id", "created_by_email", "creator_name", "employee_email", "employee_name",
+    "status", "sentiment", "tags", "strengths", "areas_to_improve",
+    "created_at", "updated_at", "acknowledged_at",
+]
+
+def _export_row(doc: dict, names: dict) -> dict:
+    anonymous = doc.get("is_anon", False)
+    return {
+        "id": str(doc["_id"]),
+        "created_by_email": "" if anonymous else doc.get("created_by_email", ""),
+        "creator_name": "Anonymous" if anonymous else names.get(doc.get("created_by_email"), "Unknown"),
+        "employee_email": doc.get("employee_email", ""),
+        "employee_name": names.get(doc.get("employee_email"), "Unknown"),
+        "status": doc.get("status"),
+        "sentiment": doc.get("sentiment"),
+        "tags": doc.get("tags") or [],
+        "strengths": doc.get("strengths", ""),
+        "areas_to_improve": doc.get("areas_to_improve", ""),
+        "created_at": doc["created_at"].isoformat() if doc.get("created_at") else None,
+        "updated_at": doc["updated_at"].isoformat() if doc.get("updated_at") else None,
+        "acknowledged_at": doc["acknowledged_at"].isoformat() if doc.get("acknowledged_at") else None,
+    }
 
+def _encode_batch(rows: List[dict], fmt: str) -> str:
+    if fmt == "ndjson":
+        return "".join(json.dumps(row) + "\n" for row in rows)
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=EXPORT_FIELDS)
+    for row in rows:
+        writer.writerow({**row, "tags": ";".join(row["tags"])})
+    return out.getvalue()
+
+async def _export_stream(org_id: str, query: dict, fmt: str, include_archived: bool):
+    if fmt == "csv":
+        out = io.StringIO()
+        csv.DictWriter(out, fieldnames=EXPORT_FIELDS).writeheader()
+        yield out.getvalue()
+
+    # constant memory: one cursor batch plus the names it needs at a time.
+    # no sort, so mongo streams straight off the index scans instead of buffering
+    models = [FeedbackDB, ArchivedFeedbackDB] if include_archived else [FeedbackDB]
+    for model in models:
+        cursor = analytics_collection(model).find(query).batch_size(EXPORT_BATCH_SIZE)
+        batch = []
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= EXPORT_BATCH_SIZE:
+                yield await _export_batch(org_id, batch, fmt)
+                batch = []
+        if batch:
+            yield await _export_batch(org_id, batch, fmt)
+
+async def _export_batch(org_id: str, batch: List[dict], fmt: str) -> str:
+    emails = {doc.get("employee_email") for doc in batch}
+    emails.update(doc.get("created_by_email") for doc in batch if not doc.get("is_anon"))
+    users = await analytics_collection(UserDB).find(
+        {"org_id": org_id, "email": {"$in": [e for e in emails if e]}}, {"_id": 0, "email": 1, "name": 1}
+    ).to_list(None)
+    names = {u["email"]: u["name"] for u in users}
+    return _encode_batch([_export_row(doc, names) for doc in batch], fmt)
+
+@router.get("/export")
+async def export_feedback(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    manager_email: Optional[str] = Query(None),
+    include_archived: bool = Query(False),
+    user: CurrentUser = Depends(require_role("manager", "admin"))
+):
+    # managers export their own team; admins the whole org or one manager's team
+    if user.role == "manager":
+        manager_email = user.email
+
+    if manager_email:
+        team = (await team_cache.lookup(user.org_id, manager_email)).as_manager
+        members = list(team.member_emails) if team else []
+        # peer feedback only once it's visible to the team (as on the timeline),
+        # never other people's drafts or open requests
+        query = {"org_id": user.org_id, "$or": [
+            {"created_by_email": manager_email},
+            {"employee_email": {"$in": members}, "status": {"$in": ["submitted", "acknowledged"]}},
+        ]}
+    else:
+        query = {"org_id": user.org_id}
+
+    media_type = "application/x-ndjson" if fmt == "ndjson" else "text/csv"
+    filename = f"feedback-export.{fmt}"
+    return StreamingResponse(
+        _export_stream(user.org_id, query, fmt, include_archived),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
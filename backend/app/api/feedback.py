@@ -1,20 +1,41 @@
-from fastapi import APIRouter, HTTPException, Query, Path, Body
-from app.models.feedback import FeedbackDB
+from fastapi import APIRouter, HTTPException, Query, Path, Body, Depends, Request, Response
+from app.models.feedback import FeedbackDB, FeedbackListView, FeedbackSearchView
 from pydantic import BaseModel, Field
-from typing import Literal, Optional, List
+from typing import Dict, Literal, Optional, List, Union
 from datetime import datetime
-from app.models.user import UserDB
-from app.models.team import TeamDB
+from app.utils.team_cache import team_cache, same_team
+from app.utils.user_cache import user_cache
+from beanie import PydanticObjectId
 from beanie.operators import And, Or
+from app.utils.loaders import UserLoader, get_user_loader
+from fastapi.responses import StreamingResponse
+from app.utils.auth import CurrentUser, get_current_user, get_stream_user
+from app.utils.events import events
+from app.utils.archive import union_archive, get_feedback_any
+from app.utils.transitions import transition, rejected, parse_feedback_id, find_feedback
+from app.utils.pagination import encode_cursor, keyset_filter
+from app.utils.etag import make_etag, not_modified, feedback_version
+from pymongo import DESCENDING
+from app.utils.rollups import snapshot, queue_change, queue_changes
+import asyncio
+import json
+import os
 
 router = APIRouter(prefix="/feedback", tags=["feedback"])
 
 
+def check_actor(user: CurrentUser, claimed: Optional[str]):
+    # the caller is whoever the token says; an email in the body may only
+    # repeat it, never act for someone else
+    if claimed and claimed != user.email:
+        raise HTTPException(status_code=403, detail="Unauthorised")
+
+
 
 #creating feedbacks 
 class FeedbackCreate(BaseModel):
     feedbackId: Optional[str]
-    created_by_email: str
+    created_by_email: Optional[str] = None
     employee_email: str
     strengths: str
     areas_to_improve: str
@@ -24,45 +45,56 @@ class FeedbackCreate(BaseModel):
     is_anon: Optional[bool] = False
 
 @router.post("/create", response_model=dict)
-async def create_feedback(data: FeedbackCreate):
-    creator = await UserDB.find_one(UserDB.email == data.created_by_email)
+async def create_feedback(data: FeedbackCreate, creator: CurrentUser = Depends(get_current_user)):
+    check_actor(creator, data.created_by_email)
+    org_id = creator.org_id
 
-    if not creator:
-        raise HTTPException(status_code=404, detail="Creator not found")
-    
-    creator_team = await TeamDB.find_one({ "$or" : [{"member_emails": creator.email}, {"manager_email": creator.email}]})
-    
-    employee = await UserDB.find_one(UserDB.email == data.employee_email)
+    employee = await user_cache.lookup(org_id, data.employee_email)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
 
-    employee_team = await TeamDB.find_one(TeamDB.member_emails == employee.email)
+    memberships = await team_cache.lookup_many(org_id, [creator.email, employee.email])
+    creator_team = memberships[creator.email].team
+    employee_team = memberships[employee.email].as_member
 
     # edge cases
     
-    if employee_team != creator_team:
+    if not same_team(employee_team, creator_team):
         raise HTTPException(status_code=400, detail="You can only send feedbacks to your team members")
     if creator.role == "manager" and data.is_anon:
         raise HTTPException(status_code=400, detail="Managers can't send anonymous feedback")
-    if creator.role == "employee" and data.created_by_email == data.employee_email:
+    if creator.role == "employee" and creator.email == data.employee_email:
         raise HTTPException(status_code=400, detail="Cannot send feedback to yourself")
+    # only the recipient acknowledges, through /{id}/acknowledge
+    if data.status not in ("draft", "submitted"):
+        raise HTTPException(status_code=409, detail=f"Cannot create {data.status} feedback")
 
 
     if data.feedbackId != "":
-        existing = await FeedbackDB.get(data.feedbackId)
-
+        # fill in a request or draft addressed from this creator to this employee
+        result = await transition(org_id, data.feedbackId, data.status, {
+            "strengths": data.strengths,
+            "areas_to_improve": data.areas_to_improve,
+            "sentiment": data.sentiment,
+            "tags": data.tags,
+            "is_anon": data.is_anon,
+            "updated_at": datetime.utcnow(),
+        }, match={"created_by_email": creator.email, "employee_email": employee.email})
+
+        if result:
+            before, after = result
+            await queue_change(snapshot(before), snapshot(after))
+            events.publish("updated", after)
+            return {"message": "requested feedback submitted successfully", "id": str(after.id)}
+
+        existing = await find_feedback(org_id, data.feedbackId)
         if existing:
-            existing.strengths = data.strengths
-            existing.areas_to_improve = data.areas_to_improve
-            existing.sentiment = data.sentiment
-            existing.tags = data.tags
-            existing.status = data.status
-            existing.is_anon = data.is_anon
-            existing.updated_at = datetime.utcnow()
-            await existing.save()
-            return {"message": "requested feedback submitted successfully", "id": str(existing.id)}
+            if (existing.created_by_email, existing.employee_email) != (creator.email, employee.email):
+                raise HTTPException(status_code=403, detail="Unauthorised")
+            raise rejected(existing, data.status)
 
     feedback = FeedbackDB(
+        org_id=org_id,
         created_by_email=creator.email,
         created_by_role=creator.role,
         is_anon=data.is_anon,
@@ -78,10 +110,109 @@ async def create_feedback(data: FeedbackCreate):
         acknowledged_at=None
     )
     await feedback.insert()
+    await queue_change(None, snapshot(feedback))
+    events.publish("created", feedback)
     return {"message": "feedback submitted successfully", "id": str(feedback.id)}
 
 
 
+#bulk feedback for review cycles
+class BulkFeedbackItem(BaseModel):
+    employee_email: str
+    strengths: str
+    areas_to_improve: str
+    sentiment: Literal["positive", "negative", "neutral"]
+    tags: Optional[List[str]] = []
+    status: Literal["draft", "submitted"] = "submitted"
+    is_anon: Optional[bool] = False
+
+class BulkFeedbackCreate(BaseModel):
+    items: List[BulkFeedbackItem] = Field(..., max_length=1000)
+
+class BulkFeedbackResultDTO(BaseModel):
+    index: int
+    employee_email: str
+    status: Literal["created", "error"]
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+class BulkFeedbackReportDTO(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkFeedbackResultDTO]
+
+@router.post("/bulk-create", response_model=BulkFeedbackReportDTO)
+async def bulk_create_feedback(data: BulkFeedbackCreate, creator: CurrentUser = Depends(get_current_user)):
+    # a fixed number of round trips however many items: one $in for the
+    # employees, one team lookup, one draft check, one insert_many
+    employee_emails = {item.employee_email for item in data.items}
+    profiles = await user_cache.lookup_many(creator.org_id, employee_emails)
+    found = {email for email, profile in profiles.items() if profile}
+
+    memberships = await team_cache.lookup_many(creator.org_id, [creator.email, *found])
+    creator_team = memberships[creator.email].team
+
+    draft_emails = [item.employee_email for item in data.items if item.status == "draft"]
+    open_drafts = set()
+    if draft_emails:
+        drafts = await FeedbackDB.find({"org_id": creator.org_id, "employee_email": {"$in": draft_emails}, "status": "draft"}).to_list()
+        open_drafts = {draft.employee_email for draft in drafts}
+
+    results = []
+    docs = []
+    seen = set()
+    now = datetime.utcnow()
+    for index, item in enumerate(data.items):
+        error = None
+        if item.employee_email not in found:
+            error = "Employee not found"
+        elif not same_team(memberships[item.employee_email].as_member, creator_team):
+            error = "You can only send feedbacks to your team members"
+        elif creator.role == "manager" and item.is_anon:
+            error = "Managers can't send anonymous feedback"
+        elif creator.role == "employee" and item.employee_email == creator.email:
+            error = "Cannot send feedback to yourself"
+        elif item.employee_email in seen:
+            error = "Duplicate employee in request"
+        elif item.status == "draft" and item.employee_email in open_drafts:
+            error = f"Already draft exists for { item.employee_email }"
+
+        if error:
+            results.append(BulkFeedbackResultDTO(index=index, employee_email=item.employee_email, status="error", error=error))
+            continue
+
+        seen.add(item.employee_email)
+        feedback = FeedbackDB(
+            id=PydanticObjectId(),
+            org_id=creator.org_id,
+            created_by_email=creator.email,
+            created_by_role=creator.role,
+            is_anon=item.is_anon,
+            employee_email=item.employee_email,
+            strengths=item.strengths,
+            areas_to_improve=item.areas_to_improve,
+            sentiment=item.sentiment,
+            tags=item.tags,
+            status=item.status,
+            requested_at=None,
+            created_at=now,
+            updated_at=now,
+            acknowledged_at=None
+        )
+        docs.append(feedback)
+        results.append(BulkFeedbackResultDTO(index=index, employee_email=item.employee_email, status="created", id=str(feedback.id)))
+
+    if docs:
+        await FeedbackDB.insert_many(docs)
+        await queue_changes((None, snapshot(doc)) for doc in docs)
+        for doc in docs:
+            events.publish("created", doc)
+
+    created = len(docs)
+    return BulkFeedbackReportDTO(created=created, failed=len(results) - created, results=results)
+
+
+
 #getting feedback list
 class FeedbackListDTO(BaseModel):
     id: str
@@ -96,36 +227,76 @@ class FeedbackListDTO(BaseModel):
     status: Literal["requested", "draft", "submitted", "acknowledged"]
     preview: str  
 
-@router.get("/get-all", response_model=List[FeedbackListDTO])
-async def get_all(email: str = Query(...)):
-    user = await UserDB.find_one(UserDB.email == email)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    raw_feedbacks = []
-
+class FeedbackPageDTO(BaseModel):
+    items: List[FeedbackListDTO]
+    next_cursor: Optional[str] = None
+
+@router.get("/get-all", response_model=Union[FeedbackPageDTO, List[FeedbackListDTO]])
+async def get_all(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    unpaginated: bool = Query(False),
+    include_archived: bool = Query(False),
+    user: CurrentUser = Depends(get_current_user),
+    users: UserLoader = Depends(get_user_loader)
+):
     if user.role == "manager":
-        raw_feedbacks = await FeedbackDB.find(FeedbackDB.created_by_email == user.email).to_list()
+        query = {"org_id": user.org_id, "created_by_email": user.email}
     elif user.role == "employee":
-        raw_feedbacks = await FeedbackDB.find({ "$or": [{ FeedbackDB.employee_email: user.email}, { FeedbackDB.created_by_email: user.email}]}).to_list()
+        query = {"org_id": user.org_id, "$or": [{ "employee_email": user.email}, { "created_by_email": user.email}]}
     else:
         raise HTTPException(status_code=404, detail="User not found")
-    
+
+    version = await feedback_version(user.org_id, user.email, user.role, query)
+    etag = make_etag("get-all", user.email, cursor, limit, unpaginated, include_archived, version)
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+
+    if cursor and not unpaginated:
+        query = {"$and": [query, keyset_filter(cursor)]}
+
+    # newest first, _id breaks ties so the keyset order is total
+    if include_archived:
+        page = [{"$sort": {"updated_at": DESCENDING, "_id": DESCENDING}}]
+        if not unpaginated:
+            page.append({"$limit": limit + 1})
+        pipeline = union_archive(query, page) + page + [{"$project": FeedbackListView.Settings.projection}]
+        raw_feedbacks = [FeedbackListView.model_validate(doc) for doc in await FeedbackDB.aggregate(pipeline).to_list()]
+    else:
+        find = FeedbackDB.find(query).sort([("updated_at", DESCENDING), ("_id", DESCENDING)])
+        if not unpaginated:
+            find = find.limit(limit + 1)
+        # only the listed fields and a server-cut preview come back from mongo
+        raw_feedbacks = await find.aggregate([], projection_model=FeedbackListView).to_list()
+
+    next_cursor = None
+    if not unpaginated and len(raw_feedbacks) > limit:
+        raw_feedbacks = raw_feedbacks[:limit]
+        last = raw_feedbacks[-1]
+        next_cursor = encode_cursor(last.updated_at, last.id)
+
+    # resolve every name this page needs in one round trip
+    emails = {fb.employee_email for fb in raw_feedbacks}
+    if user.role == "employee":
+        emails.update(fb.created_by_email for fb in raw_feedbacks)
+    await users.load_many(emails)
+
     name_feedbacks = []
 
     for fb in raw_feedbacks:
         creator_name = "Anonymous" if fb.is_anon else fb.created_by_email
         creator_email = ""
         employee_email = fb.employee_email
-        employee = await UserDB.find_one(UserDB.email == fb.employee_email)
-        employee_name = employee.name if employee else "Invalid"
+        employee_name = users.name(fb.employee_email)
 
         if user.role == "manager":
             creator_name = user.name
             creator_email = user.email
         elif user.role == "employee":
-            creator = await UserDB.find_one(UserDB.email == fb.created_by_email)
-            creator_name = creator.name if creator else "Invalid"
+            creator_name = users.name(fb.created_by_email)
             creator_email = fb.created_by_email
         if fb.is_anon : creator_name = "Anonymous"
 
@@ -147,13 +318,6 @@ async def get_all(email: str = Query(...)):
             name_feedbacks.append(dto)
             continue
 
-        # prepare preview
-        if fb.status == "requested":
-            preview = ""
-        else:
-            strengths = fb.strengths or ""
-            preview = strengths[:60] + ("..." if len(strengths) > 60 else "")
-        
         dto = FeedbackListDTO(
             id=str(fb.id),
             employee_name=employee_name,
@@ -162,15 +326,170 @@ async def get_all(email: str = Query(...)):
             creator_email=creator_email,
             sentiment=fb.sentiment,
             status=fb.status,
-            preview=preview,
+            preview=fb.preview,
             created_at=fb.created_at,
             updated_at=fb.updated_at,
             requested_at=fb.requested_at
         )
         name_feedbacks.append(dto)
 
-    name_feedbacks.sort(key=lambda x: x.updated_at, reverse=True)
-    return name_feedbacks
+    if unpaginated:
+        return name_feedbacks
+    return FeedbackPageDTO(items=name_feedbacks, next_cursor=next_cursor)
+
+
+
+#keyword search over strengths/areas_to_improve, ranked by text score
+class FeedbackSearchItemDTO(BaseModel):
+    id: str
+    employee_name: str
+    employee_email: str
+    creator_name: str
+    creator_email: str
+    sentiment: Optional[Literal["positive", "negative", "neutral"]]
+    status: Literal["requested", "draft", "submitted", "acknowledged"]
+    tags: List[str] = []
+    preview: str
+    score: float
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+class FeedbackSearchFacetsDTO(BaseModel):
+    tags: Dict[str, int] = {}
+    status: Dict[str, int] = {}
+
+class FeedbackSearchDTO(BaseModel):
+    items: List[FeedbackSearchItemDTO]
+    total: int
+    page: int
+    limit: int
+    facets: FeedbackSearchFacetsDTO
+
+SEARCH_TAG_FACETS = 20
+
+@router.get("/search", response_model=FeedbackSearchDTO)
+async def search_feedback(
+    q: str = Query(..., min_length=2, max_length=200),
+    tags: List[str] = Query([]),
+    status: List[Literal["requested", "draft", "submitted", "acknowledged"]] = Query([]),
+    sentiment: List[Literal["positive", "negative", "neutral"]] = Query([]),
+    date_from: Optional[datetime] = Query(None),
+    date_to: Optional[datetime] = Query(None),
+    page: int = Query(1, ge=1, le=50),
+    limit: int = Query(20, ge=1, le=100),
+    user: CurrentUser = Depends(get_current_user),
+    users: UserLoader = Depends(get_user_loader)
+):
+    # same visibility as get-all, except drafts addressed to an employee
+    # aren't searchable since their content is hidden from them
+    if user.role == "manager":
+        visibility = {"created_by_email": user.email}
+    elif user.role == "employee":
+        visibility = {"$or": [
+            {"created_by_email": user.email},
+            {"employee_email": user.email, "status": {"$ne": "draft"}},
+        ]}
+    else:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    filters = [visibility]
+    if tags:
+        filters.append({"tags": {"$all": tags}})
+    if status:
+        filters.append({"status": {"$in": status}})
+    if sentiment:
+        filters.append({"sentiment": {"$in": sentiment}})
+    if date_from or date_to:
+        created_at = {}
+        if date_from:
+            created_at["$gte"] = date_from
+        if date_to:
+            created_at["$lte"] = date_to
+        filters.append({"created_at": created_at})
+
+    # one round trip: the ranked page plus total and facet counts over every match
+    pipeline = [
+        {"$match": {"$text": {"$search": q}, "org_id": user.org_id, "$and": filters}},
+        {"$facet": {
+            "items": [
+                {"$sort": {"score": {"$meta": "textScore"}, "updated_at": DESCENDING, "_id": DESCENDING}},
+                {"$skip": (page - 1) * limit},
+                {"$limit": limit},
+                {"$project": FeedbackSearchView.Settings.projection},
+            ],
+            "total": [{"$count": "count"}],
+            "tags": [
+                {"$unwind": "$tags"},
+                {"$group": {"_id": "$tags", "count": {"$sum": 1}}},
+                {"$sort": {"count": DESCENDING, "_id": 1}},
+                {"$limit": SEARCH_TAG_FACETS},
+            ],
+            "status": [{"$group": {"_id": "$status", "count": {"$sum": 1}}}],
+        }},
+    ]
+    result = (await FeedbackDB.aggregate(pipeline).to_list())[0]
+    hits = [FeedbackSearchView.model_validate(doc) for doc in result["items"]]
+
+    await users.load_many({fb.employee_email for fb in hits} | {fb.created_by_email for fb in hits if not fb.is_anon})
+
+    items = []
+    for fb in hits:
+        anonymous = fb.is_anon and user.email != fb.created_by_email
+        items.append(FeedbackSearchItemDTO(
+            id=str(fb.id),
+            employee_name=users.name(fb.employee_email),
+            employee_email=fb.employee_email,
+            creator_name="Anonymous" if fb.is_anon else users.name(fb.created_by_email),
+            creator_email="" if anonymous else fb.created_by_email,
+            sentiment=fb.sentiment,
+            status=fb.status,
+            tags=fb.tags or [],
+            preview=fb.preview,
+            score=fb.score,
+            created_at=fb.created_at,
+            updated_at=fb.updated_at
+        ))
+
+    return FeedbackSearchDTO(
+        items=items,
+        total=result["total"][0]["count"] if result["total"] else 0,
+        page=page,
+        limit=limit,
+        facets=FeedbackSearchFacetsDTO(
+            tags={b["_id"]: b["count"] for b in result["tags"]},
+            status={b["_id"]: b["count"] for b in result["status"]}
+        )
+    )
+
+#server-sent events so clients refetch on change instead of polling get-all
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("FEEDBACK_EVENTS_HEARTBEAT_SECONDS", "15"))
+
+async def _event_stream(request: Request, org_id: str, email: str):
+    queue = events.subscribe(org_id, email)
+    try:
+        yield "retry: 3000\n\n"
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                # comment line keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    finally:
+        events.unsubscribe(org_id, email, queue)
+
+@router.get("/events")
+async def feedback_events(request: Request, user: CurrentUser = Depends(get_stream_user)):
+    return StreamingResponse(
+        _event_stream(request, user.org_id, user.email),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/events/stats", response_model=dict)
+async def get_event_stats():
+    return events.stats()
 
     
         
@@ -192,16 +511,12 @@ class FeedbackPublicDTO(BaseModel):
     acknowledged_at: Optional[datetime]
 
 @router.get("/{feedback_id}", response_model=FeedbackPublicDTO)
-async def get_feedback(feedback_id: str = Path(...), requestor_email: str = Query(...)):
-    requestor = await UserDB.find_one(UserDB.email == requestor_email)
-    if not requestor:
-        raise HTTPException(status_code=404, detail="user not found")
-    
-    feedback = await FeedbackDB.get(feedback_id)
+async def get_feedback(feedback_id: str = Path(...), requestor: CurrentUser = Depends(get_current_user)):
+    feedback = await get_feedback_any(requestor.org_id, parse_feedback_id(feedback_id))
     if not feedback:
         raise HTTPException(status_code=404, detail="feedback not found")
 
-    is_creator = requestor_email == feedback.created_by_email
+    is_creator = requestor.email == feedback.created_by_email
     is_recipient = requestor.email == feedback.employee_email
 
 
@@ -219,26 +534,30 @@ async def get_feedback(feedback_id: str = Path(...), requestor_email: str = Quer
 #acknowledging feedback
 @router.post("/{feedback_id}/acknowledge")
 
-async def acknowledge_feedback(feedback_id: str = Path(...), employee_email: str = Body(..., embed=True)):
-    employee = await UserDB.find_one(UserDB.email == employee_email)
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
-    
+async def acknowledge_feedback(
+    feedback_id: str = Path(...),
+    employee_email: Optional[str] = Body(None, embed=True),
+    user: CurrentUser = Depends(get_current_user)
+):
+    check_actor(user, employee_email)
+    org_id = user.org_id
 
-    
-    feedback = await FeedbackDB.get(feedback_id)
-    if not feedback:
-        raise HTTPException(status_code=404, detail="Feedback not found")
-    
-    if str(employee.email) != feedback.employee_email:
-        raise HTTPException(status_code=403, detail="Unauthorised")
-    
-    if feedback.status == "acknowledged":
-        return {"message": "already acknowledged"}
-    
-    feedback.status = "acknowledged"
-    feedback.acknowledged_at = datetime.utcnow()
-    await feedback.save()
+    # only the recipient, and only a submitted feedback
+    now = datetime.utcnow()
+    result = await transition(
+        org_id, feedback_id, "acknowledged", {"acknowledged_at": now, "updated_at": now}, match={"employee_email": user.email}
+    )
+    if result is None:
+        feedback = await find_feedback(org_id, feedback_id)
+        if feedback and feedback.employee_email != user.email:
+            raise HTTPException(status_code=403, detail="Unauthorised")
+        if feedback and feedback.status == "acknowledged":
+            return {"message": "already acknowledged"}
+        raise rejected(feedback, "acknowledged")
+
+    before, after = result
+    await queue_change(snapshot(before), snapshot(after))
+    events.publish("acknowledged", after)
 
     return {"message": "feedback acknowledged successfully"}
 
@@ -246,36 +565,35 @@ async def acknowledge_feedback(feedback_id: str = Path(...), employee_email: str
 
 #requesting feedback
 class FeedbackRequestDTO(BaseModel):
-    requestor_email: str  
+    requestor_email: Optional[str] = None
     giver_email: str
     tags: Optional[List[str]] = []
 
 @router.post("/request", response_model=dict)
-async def request_feedback(data: FeedbackRequestDTO):
-    requestor = await UserDB.find_one(UserDB.email == data.requestor_email)
-    if not requestor:
-        raise HTTPException(status_code=404, detail="User not found")
+async def request_feedback(data: FeedbackRequestDTO, requestor: CurrentUser = Depends(get_current_user)):
+    check_actor(requestor, data.requestor_email)
+    org_id = requestor.org_id
 
     if requestor.role == "manager":
         raise HTTPException(status_code=400, detail="Managers can't request feedback")
 
-    giver = await UserDB.find_one(UserDB.email == data.giver_email)
+    giver = await user_cache.lookup(org_id, data.giver_email)
     if not giver:
         raise HTTPException(status_code=404, detail="User not found")
 
     if giver.email == requestor.email:
         raise HTTPException(status_code=400, detail="Cannot request feedback from yourself")
     
-    requestor_team = await TeamDB.find_one(TeamDB.member_emails == requestor.email)
-    giver_team = await TeamDB.find_one(TeamDB.manager_email == giver.email)
-    if not giver_team:
-        giver_team = await TeamDB.find_one(TeamDB.member_emails == giver.email)
+    memberships = await team_cache.lookup_many(org_id, [requestor.email, giver.email])
+    requestor_team = memberships[requestor.email].as_member
+    giver_team = memberships[giver.email].as_manager or memberships[giver.email].as_member
 
-    if requestor_team != giver_team:
+    if not same_team(requestor_team, giver_team):
         raise HTTPException(status_code=400, detail="You can only request feedback from your team members")
 
     existing = await FeedbackDB.find_one(
             And(
+        {"org_id": org_id},
         {"created_by_email": giver.email},
         {"employee_email": requestor.email},
         Or(
@@ -290,6 +608,7 @@ async def request_feedback(data: FeedbackRequestDTO):
         raise HTTPException(status_code=409, detail="Request already exists")
 
     feedback = FeedbackDB(
+        org_id=org_id,
         created_by_email=giver.email,
         created_by_role=giver.role,
         is_anon=False,
@@ -305,51 +624,60 @@ async def request_feedback(data: FeedbackRequestDTO):
         acknowledged_at=None,
     )
     await feedback.insert()
+    await queue_change(None, snapshot(feedback))
+    events.publish("requested", feedback)
     return {"message": "feedback request created", "id": str(feedback.id)}
 
 @router.post("/draft", response_model=dict)
-async def save_feedback_draft(data: FeedbackCreate):
-    creator = await UserDB.find_one(UserDB.email == data.created_by_email)
-    if not creator:
-        raise HTTPException(status_code=404, detail="Creator not found")
-    
-    employee = await UserDB.find_one(UserDB.email == data.employee_email)
+async def save_feedback_draft(data: FeedbackCreate, creator: CurrentUser = Depends(get_current_user)):
+    check_actor(creator, data.created_by_email)
+    org_id = creator.org_id
+
+    employee = await user_cache.lookup(org_id, data.employee_email)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
 
     if creator.role == "manager" and data.is_anon:
         raise HTTPException(status_code=400, detail="Managers can't send anonymous feedback")
-    if creator.role == "employee" and data.created_by_email == data.employee_email:
+    if creator.role == "employee" and creator.email == data.employee_email:
         raise HTTPException(status_code=400, detail="Cannot send feedback to yourself")
 
     # if a draft already exists don't create a new one
 
     # Save as draft (overwrite if a draft exists)
     if data.feedbackId != "":
-        existing_draft = await FeedbackDB.get(data.feedbackId)
-
+        result = await transition(org_id, data.feedbackId, "draft", {
+            "strengths": data.strengths,
+            "areas_to_improve": data.areas_to_improve,
+            "sentiment": data.sentiment,
+            "tags": data.tags,
+            "is_anon": data.is_anon,
+            "updated_at": datetime.utcnow(),
+        }, match={"created_by_email": creator.email})
+
+        if result:
+            before, after = result
+            await queue_change(snapshot(before), snapshot(after))
+
+            return {"message": "draft updated", "id": str(after.id)}
+
+        existing_draft = await find_feedback(org_id, data.feedbackId)
         if existing_draft:
-            await existing_draft.set({
-                FeedbackDB.strengths : data.strengths,
-                FeedbackDB.areas_to_improve : data.areas_to_improve,
-                FeedbackDB.sentiment : data.sentiment,
-                FeedbackDB.tags : data.tags,
-                FeedbackDB.is_anon : data.is_anon,
-                FeedbackDB.updated_at : datetime.utcnow(),
-                FeedbackDB.status: "draft"
-            })
-
-            return {"message": "draft updated", "id": str(existing_draft.id)}
-
-    find_feedback = await FeedbackDB.find_one({
-        FeedbackDB.employee_email: data.employee_email,
-        FeedbackDB.status: "draft"
+            if existing_draft.created_by_email != creator.email:
+                raise HTTPException(status_code=403, detail="Unauthorised")
+            raise rejected(existing_draft, "draft")
+
+    open_draft = await FeedbackDB.find_one({
+        "org_id": org_id,
+        "employee_email": data.employee_email,
+        "status": "draft"
     })
 
-    if find_feedback:
+    if open_draft:
         raise HTTPException(status_code=400, detail=f"Already draft exists for { data.employee_email }")
 
     feedback = FeedbackDB(
+        org_id=org_id,
         created_by_email=creator.email,
         created_by_role=creator.role,
         is_anon=data.is_anon,
@@ -365,6 +693,7 @@ async def save_feedback_draft(data: FeedbackCreate):
         acknowledged_at=None
     )
     await feedback.insert()
+    await queue_change(None, snapshot(feedback))
     return {"message": "draft saved", "id": str(feedback.id)}
 
 
@@ -379,29 +708,41 @@ class FeedbackUpdateDTO(BaseModel):
 @router.put("/{feedback_id}/update", response_model=dict)
 async def update_feedback(
     feedback_id: str = Path(...),
-    data: FeedbackUpdateDTO = Body(...)
+    data: FeedbackUpdateDTO = Body(...),
+    user: CurrentUser = Depends(get_current_user)
 ):
-    feedback = await FeedbackDB.get(feedback_id)
-    if not feedback:
-        raise HTTPException(status_code=404, detail="Feedback not found")
+    org_id = user.org_id
+    fields = data.dict(exclude_unset=True)
+    target = fields.pop("status", None)
+    fields["updated_at"] = datetime.utcnow()
 
-    if feedback.status == "acknowledged":
-        raise HTTPException(status_code=400, detail="Cannot update acknowledged feedback")
+    # only the creator edits their feedback
+    result = await transition(org_id, feedback_id, target, fields, match={"created_by_email": user.email})
+    if result is None:
+        feedback = await find_feedback(org_id, feedback_id)
+        if feedback and feedback.created_by_email != user.email:
+            raise HTTPException(status_code=403, detail="Unauthorised")
+        raise rejected(feedback, target)
 
-    
-    for field, value in data.dict(exclude_unset=True).items():
-        setattr(feedback, field, value)
-
-    feedback.updated_at = datetime.utcnow()
-    await feedback.save()
-    return {"message": "feedback updated", "id": str(feedback.id)}
+    before, after = result
+    await queue_change(snapshot(before), snapshot(after))
+    events.publish("updated", after)
+    return {"message": "feedback updated", "id": str(after.id)}
 
 
 @router.delete("/{feedback_id}", response_model=dict)
-async def delete_feedback(feedback_id: str = Path(...)):
-    
-    await (await FeedbackDB.get(feedback_id)).delete()
-    
+async def delete_feedback(feedback_id: str = Path(...), user: CurrentUser = Depends(get_current_user)):
+    # only the creator deletes their feedback
+    doc = await FeedbackDB.get_motor_collection().find_one_and_delete(
+        {"_id": parse_feedback_id(feedback_id), "org_id": user.org_id, "created_by_email": user.email}
+    )
+    if not doc:
+        if await find_feedback(user.org_id, feedback_id):
+            raise HTTPException(status_code=403, detail="Unauthorised")
+        raise HTTPException(status_code=404, detail="Feedback not found")
+
+    await queue_change(snapshot(FeedbackDB.model_validate(doc)), None)
+
     return {
         "feedbackId": feedback_id,
         "status": "deleted"
@@ -1,45 +1,126 @@
-from fastapi import APIRouter, HTTPException, Query
-from app.models.user import UserDB
+from fastapi import APIRouter, HTTPException, Depends
 from app.models.team import TeamDB
+from app.utils.team_cache import team_cache
+from app.utils.user_cache import user_cache
+from app.utils.auth import CurrentUser, require_role
 from datetime import datetime
 from pydantic import BaseModel, EmailStr
-from typing import List
+from pymongo import UpdateMany, UpdateOne
+from typing import Dict, List, Literal, Optional
 
 router = APIRouter(prefix="/team", tags=["teams"])
 
 class TeamCreateDTO(BaseModel):
     manager_email: EmailStr
-    member_emails: List[EmailStr] 
+    member_emails: List[EmailStr]
+
+async def find_roles(org_id: str, teams: List[TeamCreateDTO]) -> Dict[str, str]:
+    # one cache pass (and one $in for the misses) for every manager and
+    # member across all the teams
+    emails = set()
+    for team in teams:
+        emails.add(team.manager_email)
+        emails.update(team.member_emails)
+    profiles = await user_cache.lookup_many(org_id, emails)
+    return {email: profile.role for email, profile in profiles.items() if profile}
+
+def team_error(team: TeamCreateDTO, roles: Dict[str, str]) -> Optional[str]:
+    if roles.get(team.manager_email) != "manager":
+        return "Invalid manager email"
+    invalid = [email for email in team.member_emails if roles.get(email) != "employee"]
+    if invalid:
+        return f"Invalid members: {', '.join(invalid)}"
+    return None
 
 @router.post("/create", response_model=dict)
 async def create_team(
     data: TeamCreateDTO,
-    admin_email: str = Query(...)
+    admin: CurrentUser = Depends(require_role("admin"))
 ):
-    
-    
-    admin = await UserDB.find_one(UserDB.email == admin_email)
-    if not admin or admin.role != "admin":
-        raise HTTPException(status_code=403, detail="Only admins can create teams")
-
-    
-    manager = await UserDB.find_one(UserDB.email == data.manager_email)
-    if not manager or manager.role != "manager":
-        raise HTTPException(status_code=400, detail="Invalid manager email")
-
-    
-    for email in data.member_emails:
-        user = await UserDB.find_one(UserDB.email == email)
-        if not user or user.role != "employee":
-            raise HTTPException(status_code=400, detail=f"Invalid member: {email}")
-
-    
+    error = team_error(data, await find_roles(admin.org_id, [data]))
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+
     team = TeamDB(
+        org_id=admin.org_id,
         manager_email=data.manager_email,
         member_emails=data.member_emails,
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow()
     )
     await team.insert()
+    team_cache.invalidate(admin.org_id, [team.manager_email, *team.member_emails])
 
     return {"message": "Team created", "id": str(team.id)}
+
+
+class TeamImportResultDTO(BaseModel):
+    index: int
+    manager_email: str
+    status: Literal["created", "updated", "error"]
+    error: Optional[str] = None
+
+class TeamImportReportDTO(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    results: List[TeamImportResultDTO]
+
+@router.post("/bulk-import", response_model=TeamImportReportDTO)
+async def bulk_import_teams(
+    teams: List[TeamCreateDTO],
+    admin: CurrentUser = Depends(require_role("admin"))
+):
+    # teams are keyed by manager: an existing team is replaced, a new one created.
+    # members who move to an imported team are pulled from their old team.
+    roles = await find_roles(admin.org_id, teams)
+    existing = await TeamDB.find({"org_id": admin.org_id, "manager_email": {"$in": [t.manager_email for t in teams]}}).to_list()
+    existing_managers = {team.manager_email for team in existing}
+
+    results = []
+    ops = []
+    managers = set()
+    assigned = set()
+    now = datetime.utcnow()
+    for index, team in enumerate(teams):
+        error = team_error(team, roles)
+        if not error and team.manager_email in managers:
+            error = "Duplicate manager in import"
+        if not error:
+            repeated = [email for email in team.member_emails if email in assigned]
+            if repeated:
+                error = f"Members already assigned in this import: {', '.join(repeated)}"
+
+        if error:
+            results.append(TeamImportResultDTO(index=index, manager_email=team.manager_email, status="error", error=error))
+            continue
+
+        managers.add(team.manager_email)
+        assigned.update(team.member_emails)
+        ops.append(UpdateOne(
+            {"org_id": admin.org_id, "manager_email": team.manager_email},
+            {
+                "$set": {"member_emails": list(team.member_emails), "updated_at": now},
+                "$setOnInsert": {"created_at": now},
+            },
+            upsert=True
+        ))
+        status = "updated" if team.manager_email in existing_managers else "created"
+        results.append(TeamImportResultDTO(index=index, manager_email=team.manager_email, status=status))
+
+    if ops:
+        ops.append(UpdateMany(
+            {"org_id": admin.org_id, "manager_email": {"$nin": list(managers)}, "member_emails": {"$in": list(assigned)}},
+            {"$pull": {"member_emails": {"$in": list(assigned)}}, "$set": {"updated_at": now}}
+        ))
+        await TeamDB.get_motor_collection().bulk_write(ops, ordered=True)
+        team_cache.invalidate(admin.org_id)
+
+    created = sum(1 for r in results if r.status == "created")
+    updated = sum(1 for r in results if r.status == "updated")
+    return TeamImportReportDTO(created=created, updated=updated, failed=len(results) - created - updated, results=results)
+
+
+@router.get("/cache-stats", response_model=dict)
+async def get_team_cache_stats():
+    return team_cache.stats()
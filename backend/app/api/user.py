@@ -1,10 +1,15 @@
-from fastapi import Depends, APIRouter, HTTPException, Query
+from fastapi import Depends, APIRouter, HTTPException, Query, Request
 from app.models.user import UserDB
-from pydantic import BaseModel, EmailStr
-from typing import List, Literal
+from pydantic import BaseModel, EmailStr, ValidationError
+from pymongo.errors import BulkWriteError
+from typing import Any, List, Literal, Optional, Tuple, Union
 import base64
+import csv
+import json
 import os
-from app.utils.auth import hash_password, verify_password
+from app.utils.auth import hash_password_async, verify_password_async, hash_passwords, hasher
+from app.utils.auth import CurrentUser, create_access_token, require_role, get_org_id
+from app.utils.user_cache import user_cache
 from datetime import timedelta
 
 
@@ -23,17 +28,18 @@ class UserPublicDTO(BaseModel):
     role: str
 
 @router.post("/register", response_model=UserPublicDTO)
-async def register_user(user: UserCreateDTO):
-    existing = await UserDB.find_one(UserDB.email == user.email)
+async def register_user(user: UserCreateDTO, org_id: str = Depends(get_org_id)):
+    existing = await UserDB.find_one({"org_id": org_id, "email": user.email})
     if existing:
         raise HTTPException(status_code=400, detail="User already exists")
     
-    new_user=UserDB(name=user.name.title(), email=user.email, password_hashed=hash_password(user.password), role= user.role)
+    new_user=UserDB(org_id=org_id, name=user.name.title(), email=user.email, password_hashed=await hash_password_async(user.password), role= user.role)
 
     try:
         await new_user.insert()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    user_cache.invalidate(org_id, [new_user.email])
 
 
     noPasswordUser = UserPublicDTO(name=new_user.name, email=new_user.email, role=new_user.role)
@@ -46,33 +52,195 @@ async def register_user(user: UserCreateDTO):
 class UserLoginDTO(BaseModel):
     email: EmailStr
     password: str
+    org_id: Optional[str] = None
 
-@router.post("/login", response_model=UserPublicDTO)
+class UserLoginResponseDTO(UserPublicDTO):
+    access_token: str
+    token_type: str = "bearer"
+
+@router.post("/login", response_model=UserLoginResponseDTO)
 async def login(credentials: UserLoginDTO):
-    existing = await UserDB.find_one(UserDB.email == credentials.email)
-    if not existing:
+    # emails are unique per org; the org only has to be named when one
+    # address is registered in several
+    query = {"email": credentials.email}
+    if credentials.org_id:
+        query["org_id"] = credentials.org_id
+    matches = await UserDB.find(query).limit(2).to_list()
+    if not matches:
         raise HTTPException(status_code=400, detail="User does not exist, please register first")
-    if not verify_password(credentials.password, existing.password_hashed):
+    if len(matches) > 1:
+        raise HTTPException(status_code=400, detail="Email is registered in several organizations, pass org_id")
+    existing = matches[0]
+    if not await verify_password_async(credentials.password, existing.password_hashed):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    return {"name": existing.name, "email": existing.email, "role": existing.role}
-
-
-
-@router.post("/bulk-register", response_model=List[UserPublicDTO])
-async def bulk_register(users: List[UserCreateDTO], admin_email: str = Query(...)):
-    admin = await UserDB.find_one(UserDB.email == admin_email)
-    if not admin or admin.role != "admin":
-        raise HTTPException(status_code=403, detail="Only admins can create teams")
-
-    collated_response = []
-
-    for user in users:
-        collated_response.append(await register_user(user))
-    
-    return collated_response
+    return {
+        "name": existing.name,
+        "email": existing.email,
+        "role": existing.role,
+        "access_token": create_access_token(existing),
+        "token_type": "bearer"
+    }
+
+
+
+class BulkRowResultDTO(BaseModel):
+    row: int
+    email: Optional[str] = None
+    status: Literal["created", "error"]
+    error: Optional[str] = None
+
+class BulkRegisterReportDTO(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkRowResultDTO]
+
+BULK_CHUNK_SIZE = 1000
+
+async def register_batch(org_id: str, rows: List[Tuple[int, UserCreateDTO]]) -> List[BulkRowResultDTO]:
+    results = {}
+
+    # one $in for every email in the batch instead of a find_one per user
+    emails = [user.email for _, user in rows]
+    existing = await UserDB.find({"org_id": org_id, "email": {"$in": emails}}).to_list()
+    taken = {u.email for u in existing}
+
+    pending = []
+    for row, user in rows:
+        if user.email in taken:
+            results[row] = BulkRowResultDTO(row=row, email=user.email, status="error", error="User already exists")
+            continue
+        taken.add(user.email)
+        pending.append((row, user))
+
+    hashes = await hash_passwords([user.password for _, user in pending])
+    docs = [
+        UserDB(org_id=org_id, name=user.name.title(), email=user.email, password_hashed=hashed, role=user.role)
+        for (_, user), hashed in zip(pending, hashes)
+    ]
+
+    for start in range(0, len(docs), BULK_CHUNK_SIZE):
+        chunk_rows = pending[start:start + BULK_CHUNK_SIZE]
+        failed = {}
+        try:
+            await UserDB.insert_many(docs[start:start + BULK_CHUNK_SIZE], ordered=False)
+        except BulkWriteError as e:
+            failed = {err["index"]: err.get("errmsg", "Insert failed") for err in e.details.get("writeErrors", [])}
+        user_cache.invalidate(org_id, [user.email for index, (_, user) in enumerate(chunk_rows) if index not in failed])
+
+        for index, (row, user) in enumerate(chunk_rows):
+            if index in failed:
+                error = "User already exists" if "E11000" in failed[index] else failed[index]
+                results[row] = BulkRowResultDTO(row=row, email=user.email, status="error", error=error)
+            else:
+                results[row] = BulkRowResultDTO(row=row, email=user.email, status="created")
+
+    return [results[row] for row, _ in rows]
+
+def build_report(results: List[BulkRowResultDTO]) -> BulkRegisterReportDTO:
+    created = sum(1 for r in results if r.status == "created")
+    return BulkRegisterReportDTO(created=created, failed=len(results) - created, results=results)
+
+
+def parse_user_row(record) -> Union[UserCreateDTO, str]:
+    # a bad row becomes its own error message instead of failing the upload
+    try:
+        return UserCreateDTO(**record)
+    except ValidationError as e:
+        error = e.errors()[0]
+        return f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}"
+    except (ValueError, TypeError) as e:
+        return str(e)
+
+
+@router.post("/bulk-register", response_model=BulkRegisterReportDTO)
+async def bulk_register(users: List[Any], admin: CurrentUser = Depends(require_role("admin"))):
+    results = []
+    rows = []
+    for row, record in enumerate(users, start=1):
+        parsed = parse_user_row(record)
+        if isinstance(parsed, str):
+            email = record.get("email") if isinstance(record, dict) else None
+            results.append(BulkRowResultDTO(row=row, email=email if isinstance(email, str) else None, status="error", error=parsed))
+        else:
+            rows.append((row, parsed))
+    for start in range(0, len(rows), BULK_CHUNK_SIZE):
+        results.extend(await register_batch(admin.org_id, rows[start:start + BULK_CHUNK_SIZE]))
+
+    results.sort(key=lambda r: r.row)
+    return build_report(results)
+
+
+async def iter_lines(stream):
+    buffer = b""
+    async for chunk in stream:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8").rstrip("\r")
+
+async def iter_upload_rows(lines, fmt: str):
+    # yields (row number, parsed user or error message) one line at a time
+    header = None
+    row = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        if fmt == "csv" and header is None:
+            header = [h.strip() for h in next(csv.reader([line]))]
+            continue
+
+        row += 1
+        try:
+            if fmt == "csv":
+                record = dict(zip(header, next(csv.reader([line]))))
+            else:
+                record = json.loads(line)
+        except ValueError as e:
+            yield row, str(e)
+            continue
+        yield row, parse_user_row(record)
+
+@router.post("/bulk-register/upload", response_model=BulkRegisterReportDTO)
+async def bulk_register_upload(
+    request: Request,
+    fmt: Optional[Literal["csv", "ndjson"]] = Query(None, alias="format"),
+    admin: CurrentUser = Depends(require_role("admin"))
+):
+    if fmt is None:
+        content_type = request.headers.get("content-type", "")
+        fmt = "csv" if "csv" in content_type else "ndjson"
+
+    # the body is parsed as it streams in and registered in fixed-size batches
+    results = []
+    batch = []
+    async for row, parsed in iter_upload_rows(iter_lines(request.stream()), fmt):
+        if isinstance(parsed, str):
+            results.append(BulkRowResultDTO(row=row, status="error", error=parsed))
+            continue
+        batch.append((row, parsed))
+        if len(batch) >= BULK_CHUNK_SIZE:
+            results.extend(await register_batch(admin.org_id, batch))
+            batch = []
+    if batch:
+        results.extend(await register_batch(admin.org_id, batch))
+
+    results.sort(key=lambda r: r.row)
+    return build_report(results)
+
+
+@router.get("/hash-stats", response_model=dict)
+async def get_hash_stats():
+    return hasher.stats()
+
+
+@router.get("/cache-stats", response_model=dict)
+async def get_user_cache_stats():
+    return user_cache.stats()
 
 
 @router.get("/all", response_model=List[UserPublicDTO])
-async def getAllUsers():
-    return await UserDB.find_all(projection_model=UserPublicDTO).to_list() 
+async def getAllUsers(org_id: str = Depends(get_org_id)):
+    return await UserDB.find({"org_id": org_id}, projection_model=UserPublicDTO).to_list() 
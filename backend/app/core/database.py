@@ -1,23 +1,133 @@
+from typing import Optional
 from beanie import init_beanie
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReadPreference
+from pymongo.read_preferences import SecondaryPreferred
 from app.models.user import UserDB
 from app.models.team import TeamDB
 from app.models.feedback import FeedbackDB
+from app.models.rollup import DashboardRollupDB
+from app.models.archive import ArchivedFeedbackDB, ArchiveCheckpointDB
+from app.models.outbox import OutboxJobDB
+from app.models.org import DEFAULT_ORG_ID
+from app.core.metrics import mongo_listener
 
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-async def init_db():
-    client = AsyncIOMotorClient(os.getenv("MONGO_URI"))
-    db = client[os.getenv("DATABASE_NAME")]
+# one client for the lifetime of the app, closed on shutdown
+_client: Optional[AsyncIOMotorClient] = None
 
+def client_options() -> dict:
+    return {
+        "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", "100")),
+        "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", "10")),
+        "maxIdleTimeMS": int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000")),
+        "connectTimeoutMS": int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000")),
+        "serverSelectionTimeoutMS": int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+        "socketTimeoutMS": int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "30000")),
+        # zlib ships with python; zstd/snappy need the zstandard and
+        # python-snappy packages, which requirements.txt doesn't install
+        "compressors": os.getenv("MONGO_COMPRESSORS", "zlib"),
+        "event_listeners": [mongo_listener],
+    }
+
+def get_client() -> AsyncIOMotorClient:
+    global _client
+    if _client is None:
+        _client = AsyncIOMotorClient(os.getenv("MONGO_URI"), **client_options())
+    return _client
+
+def close_db():
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+def _analytics_read_preference():
+    if os.getenv("MONGO_ANALYTICS_READ_PREFERENCE", "secondaryPreferred") == "primary":
+        return ReadPreference.PRIMARY
+    return SecondaryPreferred(max_staleness=int(os.getenv("MONGO_ANALYTICS_MAX_STALENESS_SECONDS", "-1")))
+
+def analytics_collection(model):
+    # read-only dashboard analytics tolerate replica lag, so they go to a
+    # secondary when there is one; write-path validation stays on the primary
+    return model.get_motor_collection().with_options(read_preference=_analytics_read_preference())
+
+async def analytics_aggregate(model, pipeline: list, projection_model=None) -> list:
+    if projection_model is not None:
+        pipeline = [*pipeline, {"$project": projection_model.Settings.projection}]
+    docs = await analytics_collection(model).aggregate(pipeline).to_list(None)
+    if projection_model is None:
+        return docs
+    return [projection_model.model_validate(doc) for doc in docs]
+
+async def migrate_feedback_collection(db):
+    # FeedbackDB used to ignore its Settings and write to a collection named
+    # after the class; move that data over before beanie builds the indexes
+    names = await db.list_collection_names()
+    if "FeedbackDB" in names and "feedback" not in names:
+        await db["FeedbackDB"].rename("feedback")
+
+# indexes that org-led ones replaced; a unique email index would also reject
+# the same address in two orgs, and a collection allows only one text index
+LEGACY_INDEXES = {
+    "users": ["email_1"],
+    "teams": ["member_emails_1", "manager_email_1"],
+    "feedback": [
+        "created_by_email_1_updated_at_-1__id_-1",
+        "created_by_email_1_created_at_-1",
+        "employee_email_1_updated_at_-1__id_-1",
+        "employee_email_1_status_1_created_at_-1",
+        "feedback_text",
+    ],
+    "feedback_archive": [
+        "created_by_email_1_updated_at_-1__id_-1",
+        "created_by_email_1_created_at_-1",
+        "employee_email_1_updated_at_-1__id_-1",
+        "employee_email_1_status_1_created_at_-1",
+    ],
+    "dashboard_rollups": ["user_email_1_role_1_period_1"],
+}
+
+async def migrate_org_partitioning(db) -> dict:
+    # documents from before org partitioning join the default org, and the
+    # old indexes go before beanie builds the org-led ones
+    backfilled = {}
+    names = await db.list_collection_names()
+    for name, legacy in LEGACY_INDEXES.items():
+        if name not in names:
+            continue
+        result = await db[name].update_many({"org_id": {"$exists": False}}, {"$set": {"org_id": DEFAULT_ORG_ID}})
+        backfilled[name] = result.modified_count
+        existing = await db[name].index_information()
+        for index in legacy:
+            if index in existing:
+                await db[name].drop_index(index)
+    return backfilled
+
+async def init_db(client=None, database_name=None):
+    # callers such as the benchmarks can pass their own client and database
+    global _client
+    if client is not None:
+        _client = client
+    db = get_client()[database_name or os.getenv("DATABASE_NAME")]
+
+    await migrate_feedback_collection(db)
+    await migrate_org_partitioning(db)
+
+    # init_beanie creates the indexes declared in each model's Settings
     await init_beanie(
         database = db,
         document_models = [
             UserDB,
             FeedbackDB,
-            TeamDB
+            TeamDB,
+            DashboardRollupDB,
+            ArchivedFeedbackDB,
+            ArchiveCheckpointDB,
+            OutboxJobDB
         ]
     )
@@ -0,0 +1,208 @@
+import asyncio
+import logging
+import os
+import random
+import socket
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional
+from pymongo import ASCENDING, ReturnDocument
+from app.models.outbox import OutboxJobDB
+from app.core.metrics import JOB_DURATION, JOB_LAG, JOB_QUEUE_DEPTH, JOB_RESULTS
+
+# Post-write side effects. Request handlers call enqueue(), which writes the
+# job to the job_outbox collection and wakes the local workers, then return.
+# Workers claim due jobs with find_one_and_update under a lease, retry
+# failures with exponential backoff and park a job as "failed" after
+# max_attempts. A job whose worker died is reclaimed once its lease expires,
+# so delivery is at-least-once.
+#
+# JOBS_MODE=inline    the API process runs JOBS_CONCURRENCY workers (default)
+# JOBS_MODE=external  the API only enqueues; run `python -m app.worker`
+
+logger = logging.getLogger(__name__)
+
+JOBS_MODE = os.getenv("JOBS_MODE", "inline")
+CONCURRENCY = int(os.getenv("JOBS_CONCURRENCY", "4"))
+POLL_SECONDS = float(os.getenv("JOBS_POLL_SECONDS", "1"))
+LEASE_SECONDS = int(os.getenv("JOBS_LEASE_SECONDS", "60"))
+MAX_ATTEMPTS = int(os.getenv("JOBS_MAX_ATTEMPTS", "5"))
+BACKOFF_SECONDS = float(os.getenv("JOBS_BACKOFF_SECONDS", "2"))
+MAX_BACKOFF_SECONDS = 300
+DEPTH_SAMPLE_SECONDS = 5
+SHUTDOWN_GRACE_SECONDS = 10
+
+JobHandler = Callable[[dict], Awaitable[None]]
+_handlers: Dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str):
+    def register(fn: JobHandler) -> JobHandler:
+        _handlers[kind] = fn
+        return fn
+    return register
+
+
+def backoff_seconds(attempts: int) -> float:
+    # full jitter keeps retries of a failed batch from landing together
+    delay = min(BACKOFF_SECONDS * 2 ** max(attempts - 1, 0), MAX_BACKOFF_SECONDS)
+    return random.uniform(delay / 2, delay)
+
+
+class JobWorker:
+    def __init__(self, concurrency: int = CONCURRENCY, poll_seconds: float = POLL_SECONDS, name: Optional[str] = None):
+        self.concurrency = concurrency
+        self.poll_seconds = poll_seconds
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self._wake = asyncio.Event()
+        self._tasks = []
+        self._sampler: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.running = 0
+
+    def start(self):
+        if self._tasks:
+            return
+        self._stopping = False
+        self._tasks = [asyncio.create_task(self._loop()) for _ in range(self.concurrency)]
+        self._sampler = asyncio.create_task(self._sample_depth())
+
+    async def stop(self):
+        # let in-flight jobs finish; anything cut off is retried after its lease
+        self._stopping = True
+        self._wake.set()
+        if self._sampler is not None:
+            self._sampler.cancel()
+            await asyncio.gather(self._sampler, return_exceptions=True)
+            self._sampler = None
+        if not self._tasks:
+            return
+        _, pending = await asyncio.wait(self._tasks, timeout=SHUTDOWN_GRACE_SECONDS)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+
+    def wake(self):
+        self._wake.set()
+
+    async def drain(self) -> int:
+        # runs every due job in the caller's task, for tools that drive the
+        # app without the background loops
+        done = 0
+        while True:
+            job = await self._claim()
+            if job is None:
+                return done
+            await self._run(job)
+            done += 1
+
+    async def _loop(self):
+        while not self._stopping:
+            try:
+                job = await self._claim()
+            except Exception:
+                logger.exception("claiming a job failed")
+                job = None
+
+            if job is None:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self.running += 1
+            try:
+                await self._run(job)
+            finally:
+                self.running -= 1
+
+    async def _claim(self) -> Optional[OutboxJobDB]:
+        now = datetime.utcnow()
+        doc = await OutboxJobDB.get_motor_collection().find_one_and_update(
+            {"$or": [
+                {"status": "pending", "run_at": {"$lte": now}},
+                {"status": "running", "locked_until": {"$lt": now}},
+            ]},
+            {
+                "$set": {
+                    "status": "running",
+                    "locked_by": self.name,
+                    "locked_until": now + timedelta(seconds=LEASE_SECONDS),
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("run_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+        return OutboxJobDB.model_validate(doc) if doc else None
+
+    async def _finish(self, job: OutboxJobDB, update: dict):
+        # guarded by the lease, a worker that lost its job doesn't overwrite the new owner
+        await OutboxJobDB.get_motor_collection().update_one(
+            {"_id": job.id, "locked_by": self.name, "status": "running"},
+            {"$set": {**update, "locked_by": None, "locked_until": None, "updated_at": datetime.utcnow()}},
+        )
+
+    async def _run(self, job: OutboxJobDB):
+        JOB_LAG.labels(job.kind).observe(max((datetime.utcnow() - job.run_at).total_seconds(), 0))
+        handler = _handlers.get(job.kind)
+        start = time.perf_counter()
+        try:
+            if handler is None:
+                raise LookupError(f"no handler registered for job kind {job.kind!r}")
+            await handler(job.payload)
+        except Exception as exc:
+            if job.attempts >= job.max_attempts:
+                JOB_RESULTS.labels(job.kind, "failed").inc()
+                logger.exception("job %s (%s) failed for good", job.id, job.kind)
+                await self._finish(job, {"status": "failed", "last_error": repr(exc), "finished_at": datetime.utcnow()})
+            else:
+                JOB_RESULTS.labels(job.kind, "retry").inc()
+                run_at = datetime.utcnow() + timedelta(seconds=backoff_seconds(job.attempts))
+                await self._finish(job, {"status": "pending", "last_error": repr(exc), "run_at": run_at})
+        else:
+            JOB_RESULTS.labels(job.kind, "done").inc()
+            await self._finish(job, {"status": "done", "finished_at": datetime.utcnow()})
+        finally:
+            JOB_DURATION.labels(job.kind).observe(time.perf_counter() - start)
+
+    async def _sample_depth(self):
+        collection = OutboxJobDB.get_motor_collection()
+        while True:
+            try:
+                for status in ("pending", "running", "failed"):
+                    JOB_QUEUE_DEPTH.labels(status).set(await collection.count_documents({"status": status}))
+            except Exception:
+                logger.exception("sampling job queue depth failed")
+            await asyncio.sleep(DEPTH_SAMPLE_SECONDS)
+
+    def stats(self) -> dict:
+        return {
+            "mode": JOBS_MODE,
+            "worker": self.name,
+            "concurrency": self.concurrency,
+            "running": self.running,
+            "handlers": sorted(_handlers),
+        }
+
+
+jobs = JobWorker()
+
+
+async def enqueue(kind: str, payload: dict, delay_seconds: float = 0, max_attempts: int = MAX_ATTEMPTS) -> OutboxJobDB:
+    now = datetime.utcnow()
+    job = OutboxJobDB(
+        kind=kind,
+        payload=payload,
+        max_attempts=max_attempts,
+        run_at=now + timedelta(seconds=delay_seconds),
+        created_at=now,
+        updated_at=now
+    )
+    await job.insert()
+    jobs.wake()
+    return job
@@ -0,0 +1,155 @@
+import time
+from prometheus_client import Counter, Gauge, Histogram
+from pymongo import monitoring
+from starlette.routing import Match
+
+# Prometheus instruments for HTTP routes and Mongo commands, exposed at /metrics.
+# Label values are route templates and collection names, so cardinality
+# stays bounded no matter how many ids pass through the URLs.
+
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling a request, per route",
+    ["method", "route"],
+)
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "Requests handled, per route and status code",
+    ["method", "route", "status"],
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled, per route",
+    ["method", "route"],
+)
+
+MONGO_LATENCY = Histogram(
+    "mongo_command_duration_seconds",
+    "Time spent in a Mongo command, per collection",
+    ["collection", "command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+MONGO_DOCUMENTS = Counter(
+    "mongo_command_documents_total",
+    "Documents returned or written by Mongo commands, per collection",
+    ["collection", "command"],
+)
+MONGO_FAILURES = Counter(
+    "mongo_command_failures_total",
+    "Mongo commands that failed, per collection",
+    ["collection", "command"],
+)
+
+
+def route_template(scope) -> str:
+    # the route is only stored in the scope once the router has run, but the
+    # in-flight gauge needs it before; unmatched paths share one label
+    # instead of one series per URL
+    partial = None
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or "unmatched"
+
+
+class MetricsMiddleware:
+    # plain ASGI middleware, so streaming responses pass straight through
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        route = route_template(scope)
+        HTTP_IN_FLIGHT.labels(method, route).inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_FLIGHT.labels(method, route).dec()
+            HTTP_LATENCY.labels(method, route).observe(elapsed)
+            HTTP_REQUESTS.labels(method, route, str(status["code"])).inc()
+
+
+def _count_documents(reply: dict) -> int:
+    cursor = reply.get("cursor")
+    if cursor:
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", [])))
+    return reply.get("n", 0)
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    def __init__(self):
+        self._collections = {}
+
+    def started(self, event):
+        collection = event.command.get("collection") if event.command_name == "getMore" else event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = event.database_name
+        self._collections[(event.connection_id, event.request_id)] = collection
+
+    def succeeded(self, event):
+        collection = self._collections.pop((event.connection_id, event.request_id), "unknown")
+        MONGO_LATENCY.labels(collection, event.command_name).observe(event.duration_micros / 1_000_000)
+        documents = _count_documents(event.reply)
+        if documents:
+            MONGO_DOCUMENTS.labels(collection, event.command_name).inc(documents)
+
+    def failed(self, event):
+        collection = self._collections.pop((event.connection_id, event.request_id), "unknown")
+        MONGO_LATENCY.labels(collection, event.command_name).observe(event.duration_micros / 1_000_000)
+        MONGO_FAILURES.labels(collection, event.command_name).inc()
+
+
+mongo_listener = MongoCommandListener()
+
+
+def register_cache_gauges(hasher, team_cache, user_cache):
+    # sampled at scrape time, nothing is added to the request path
+    Gauge("password_hash_running", "bcrypt calls running").set_function(lambda: hasher.running)
+    Gauge("password_hash_queued", "bcrypt calls waiting for a worker").set_function(lambda: hasher.queued)
+    Gauge("password_hash_bulk_queued", "bulk bcrypt calls waiting behind interactive ones").set_function(lambda: hasher.bulk_queued)
+    Gauge("password_hash_rejected", "bcrypt calls shed with 503").set_function(lambda: hasher.rejected)
+    Gauge("team_cache_hits", "Team membership cache hits").set_function(lambda: team_cache.hits)
+    Gauge("team_cache_misses", "Team membership cache misses").set_function(lambda: team_cache.misses)
+    Gauge("team_cache_size", "Emails in the team membership cache").set_function(lambda: team_cache.stats()["size"])
+    Gauge("user_cache_hits", "User profile cache hits").set_function(lambda: user_cache.hits)
+    Gauge("user_cache_misses", "User profile cache misses").set_function(lambda: user_cache.misses)
+    Gauge("user_cache_size", "Profiles in the user profile cache").set_function(lambda: user_cache.stats()["size"])
+
+
+JOB_QUEUE_DEPTH = Gauge(
+    "job_queue_depth",
+    "Outbox jobs per status, sampled by the workers",
+    ["status"],
+)
+JOB_LAG = Histogram(
+    "job_lag_seconds",
+    "Time from a job becoming due to a worker picking it up",
+    ["kind"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+JOB_DURATION = Histogram(
+    "job_duration_seconds",
+    "Time spent running a job handler",
+    ["kind"],
+)
+JOB_RESULTS = Counter(
+    "job_results_total",
+    "Job runs by outcome: done, retry or failed",
+    ["kind", "outcome"],
+)
@@ -1,40 +1,20 @@
-from fastapi import FastAPI, HTTPException, Depends, status
-from app.core.database import init_db
+from fastapi import FastAPI, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from app.core.database import init_db, close_db
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import user
 from app.api import feedback
 from app.api import dashboard
 from app.api import team
-
-from fastapi.security import HTTPBasic, HTTPBasicCredentials
-from typing_extensions import Annotated
-import secrets
+from app.utils.auth import hasher
+from app.utils.team_cache import team_cache
+from app.utils.user_cache import user_cache
+from app.utils.events import events
+from app.core.jobs import JOBS_MODE, jobs
+from app.core.metrics import MetricsMiddleware, register_cache_gauges
 
 app = FastAPI(title="feedback")
 
-security=HTTPBasic()
-
-def get_current_username(
-    credentials: Annotated[HTTPBasicCredentials, Depends(security)],
-):
-    current_username_bytes = credentials.username.encode("utf8")
-    correct_username_bytes = b"stanleyjobson"
-    is_correct_username = secrets.compare_digest(
-        current_username_bytes, correct_username_bytes
-    )
-    current_password_bytes = credentials.password.encode("utf8")
-    correct_password_bytes = b"swordfish"
-    is_correct_password = secrets.compare_digest(
-        current_password_bytes, correct_password_bytes
-    )
-    if not (is_correct_username and is_correct_password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect username or password",
-            headers={"WWW-Authenticate": "Basic"},
-        )
-    return credentials.username
-
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -42,6 +22,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"]
 )
+app.add_middleware(MetricsMiddleware)
+register_cache_gauges(hasher, team_cache, user_cache)
    
 app.include_router(user.router)
 app.include_router(team.router)
@@ -52,6 +34,21 @@ app.include_router(dashboard.router)
 @app.on_event("startup")
 async def start_db():
     await init_db()
+    events.start()
+    user_cache.start()
+    if JOBS_MODE == "inline":
+        jobs.start()
+
+@app.on_event("shutdown")
+async def stop_hasher():
+    hasher.shutdown()
+
+@app.on_event("shutdown")
+async def stop_db():
+    await jobs.stop()
+    await events.stop()
+    await user_cache.stop()
+    close_db()
 
 
 
@@ -59,6 +56,10 @@ async def start_db():
 async def root():
     return {"message": "Backend environment is running"} 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 # @app.get("*")
 # async def notFound():
 #     raise HTTPException(status_code=404, detail="URL not found")
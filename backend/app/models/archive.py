@@ -0,0 +1,37 @@
+from beanie import Document, PydanticObjectId
+from typing import Optional
+from datetime import datetime
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from app.models.feedback import FeedbackDB
+
+# Cold tier: acknowledged feedback past FEEDBACK_ARCHIVE_AFTER_DAYS is moved
+# here by app.scripts.archive_feedback so the hot collection and its indexes
+# stay small. Documents keep their _id, so lookups by id fall back here.
+
+class ArchivedFeedbackDB(FeedbackDB):
+    archived_at: Optional[datetime] = None
+
+    class Settings:
+        name = "feedback_archive"
+        indexes = [
+            IndexModel([("org_id", ASCENDING), ("created_by_email", ASCENDING), ("updated_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("org_id", ASCENDING), ("created_by_email", ASCENDING), ("created_at", DESCENDING)]),
+            IndexModel([("org_id", ASCENDING), ("employee_email", ASCENDING), ("updated_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("org_id", ASCENDING), ("employee_email", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING)]),
+        ]
+
+class ArchiveCheckpointDB(Document):
+    job: str
+    cutoff: datetime
+    last_acknowledged_at: Optional[datetime] = None
+    last_id: Optional[PydanticObjectId] = None
+    archived: int = 0
+    started_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Settings:
+        name = "archive_checkpoints"
+        indexes = [
+            IndexModel([("job", ASCENDING)], unique=True),
+        ]
@@ -1,9 +1,12 @@
-from beanie import Document
-from pydantic import Field
+from beanie import Document, PydanticObjectId
+from pydantic import BaseModel, Field
 from typing import Literal, Optional, List
 from datetime import datetime
+from pymongo import IndexModel, ASCENDING, DESCENDING, TEXT
+from app.models.org import DEFAULT_ORG_ID
 
 class FeedbackDB(Document):
+    org_id: str = DEFAULT_ORG_ID
     created_by_email: str
     created_by_role: str
     employee_email: str
@@ -19,5 +22,133 @@ class FeedbackDB(Document):
     updated_at: Optional[datetime]
     acknowledged_at: Optional[datetime]
 
-class Settings:
-    name="feedback"
\ No newline at end of file
+    class Settings:
+        name = "feedback"
+        indexes = [
+            # manager lists, counts and the created_by side of employee lists
+            IndexModel([("org_id", ASCENDING), ("created_by_email", ASCENDING), ("updated_at", DESCENDING), ("_id", DESCENDING)]),
+            # sentiment trends over a creator's date window
+            IndexModel([("org_id", ASCENDING), ("created_by_email", ASCENDING), ("created_at", DESCENDING)]),
+            # the recipient side of employee lists
+            IndexModel([("org_id", ASCENDING), ("employee_email", ASCENDING), ("updated_at", DESCENDING), ("_id", DESCENDING)]),
+            # timeline and draft/request lookups by recipient and status
+            IndexModel([("org_id", ASCENDING), ("employee_email", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING)]),
+            # the archival job's batches of old acknowledged feedback, across orgs
+            IndexModel([("status", ASCENDING), ("acknowledged_at", ASCENDING), ("_id", ASCENDING)]),
+            # keyword search, a collection can only hold one text index;
+            # the org_id prefix means every search must name its org
+            IndexModel(
+                [("org_id", ASCENDING), ("strengths", TEXT), ("areas_to_improve", TEXT)],
+                name="feedback_org_text",
+                default_language="english"
+            ),
+        ]
+
+
+def preview_expression(length: int = 60, ellipsis_after: int = 60) -> dict:
+    # first `length` characters of strengths, with "..." once it runs past `ellipsis_after`
+    strengths = {"$ifNull": ["$strengths", ""]}
+    return {"$cond": [
+        {"$eq": ["$status", "requested"]},
+        "",
+        {"$concat": [
+            {"$substrCP": [strengths, 0, length]},
+            {"$cond": [{"$gt": [{"$strLenCP": strengths}, ellipsis_after]}, "...", ""]},
+        ]},
+    ]}
+
+
+# projection models for list endpoints: only these fields (and the preview,
+# cut server side) leave mongo, never the full strengths/areas text
+
+class FeedbackListView(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    created_by_email: str
+    employee_email: str
+    is_anon: bool = False
+    sentiment: Optional[Literal["positive", "negative", "neutral"]] = None
+    status: Literal["requested", "draft", "submitted", "acknowledged"]
+    requested_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    preview: str = ""
+
+    class Settings:
+        projection = {
+            "_id": 1,
+            "created_by_email": 1,
+            "employee_email": 1,
+            "is_anon": 1,
+            "sentiment": 1,
+            "status": 1,
+            "requested_at": 1,
+            "created_at": 1,
+            "updated_at": 1,
+            "preview": preview_expression(),
+        }
+
+class FeedbackTimelineView(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    created_by_email: str
+    is_anon: bool = False
+    sentiment: Optional[Literal["positive", "negative", "neutral"]] = None
+    updated_at: Optional[datetime] = None
+    preview: str = ""
+
+    class Settings:
+        projection = {
+            "_id": 1,
+            "created_by_email": 1,
+            "is_anon": 1,
+            "sentiment": 1,
+            "updated_at": 1,
+            "preview": preview_expression(ellipsis_after=59),
+        }
+
+class FeedbackAnalyticsView(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    employee_email: str
+    sentiment: Optional[Literal["positive", "negative", "neutral"]] = None
+    status: Literal["requested", "draft", "submitted", "acknowledged"]
+    tags: Optional[List[str]] = []
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Settings:
+        projection = {
+            "_id": 1,
+            "employee_email": 1,
+            "sentiment": 1,
+            "status": 1,
+            "tags": 1,
+            "created_at": 1,
+            "updated_at": 1,
+        }
+
+class FeedbackSearchView(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    created_by_email: str
+    employee_email: str
+    is_anon: bool = False
+    sentiment: Optional[Literal["positive", "negative", "neutral"]] = None
+    status: Literal["requested", "draft", "submitted", "acknowledged"]
+    tags: Optional[List[str]] = []
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    preview: str = ""
+    score: float = 0
+
+    class Settings:
+        projection = {
+            "_id": 1,
+            "created_by_email": 1,
+            "employee_email": 1,
+            "is_anon": 1,
+            "sentiment": 1,
+            "status": 1,
+            "tags": 1,
+            "created_at": 1,
+            "updated_at": 1,
+            "preview": preview_expression(),
+            "score": {"$meta": "textScore"},
+        }
@@ -0,0 +1,22 @@
+import os
+
+# Every tenant-owned document carries org_id and every index leads with it,
+# so per-org queries stay on one index range (and on one set of shards once
+# the collections are sharded on the keys below). Data written before
+# partitioning belongs to DEFAULT_ORG_ID.
+
+DEFAULT_ORG_ID = os.getenv("DEFAULT_ORG_ID", "default")
+
+SHARD_KEYS = {
+    "users": {"org_id": 1, "email": 1},
+    "teams": {"org_id": 1, "manager_email": 1},
+    # transitions, deletes and archive upserts filter on org_id + _id only
+    # (acknowledge doesn't know the creator), and findAndModify needs the
+    # whole shard key before MongoDB 7.1
+    "feedback": {"org_id": 1, "_id": 1},
+    "feedback_archive": {"org_id": 1, "_id": 1},
+}
+
+# dashboard_rollups stays unsharded: it is small (a document per user and
+# month) and rebuild_rollups swaps it in by renaming a scratch collection
+# over it, which a sharded target doesn't support
@@ -0,0 +1,32 @@
+from beanie import Document
+from typing import Any, Dict, Literal, Optional
+from datetime import datetime
+from pymongo import IndexModel, ASCENDING
+
+class OutboxJobDB(Document):
+    kind: str
+    payload: Dict[str, Any] = {}
+    status: Literal["pending", "running", "done", "failed"] = "pending"
+    attempts: int = 0
+    max_attempts: int = 5
+    run_at: datetime
+    locked_by: Optional[str] = None
+    locked_until: Optional[datetime] = None
+    last_error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Settings:
+        name = "job_outbox"
+        indexes = [
+            # claiming: due pending jobs, and running jobs whose lease expired
+            IndexModel([("status", ASCENDING), ("run_at", ASCENDING)]),
+            IndexModel([("status", ASCENDING), ("locked_until", ASCENDING)]),
+            # finished jobs are kept a week for inspection
+            IndexModel(
+                [("finished_at", ASCENDING)],
+                expireAfterSeconds=7 * 24 * 3600,
+                partialFilterExpression={"status": "done"}
+            ),
+        ]
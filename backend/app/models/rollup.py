@@ -0,0 +1,25 @@
+from beanie import Document
+from pydantic import BaseModel
+from typing import Dict, Literal
+from pymongo import IndexModel, ASCENDING
+from app.models.org import DEFAULT_ORG_ID
+
+class RollupCounts(BaseModel):
+    total: int = 0
+    sentiment: Dict[str, int] = {}
+    status: Dict[str, int] = {}
+
+class DashboardRollupDB(Document):
+    org_id: str = DEFAULT_ORG_ID
+    user_email: str
+    role: Literal["manager", "employee", "admin"]
+    period: str  # "all" or the created_at month, e.g. "2025-06"
+
+    given: RollupCounts = RollupCounts()
+    received: RollupCounts = RollupCounts()
+
+    class Settings:
+        name = "dashboard_rollups"
+        indexes = [
+            IndexModel([("org_id", ASCENDING), ("user_email", ASCENDING), ("role", ASCENDING), ("period", ASCENDING)], unique=True),
+        ]
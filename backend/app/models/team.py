@@ -2,8 +2,11 @@ from beanie import Document
 from typing import List
 from pydantic import  EmailStr
 from datetime import datetime
+from pymongo import IndexModel, ASCENDING
+from app.models.org import DEFAULT_ORG_ID
 
 class TeamDB(Document):
+    org_id: str = DEFAULT_ORG_ID
     manager_email: EmailStr
     member_emails: List[EmailStr]
     
@@ -12,4 +15,8 @@ class TeamDB(Document):
     
 
     class Settings:
-        name = "teams"
\ No newline at end of file
+        name = "teams"
+        indexes = [
+            IndexModel([("org_id", ASCENDING), ("member_emails", ASCENDING)]),
+            IndexModel([("org_id", ASCENDING), ("manager_email", ASCENDING)]),
+        ]
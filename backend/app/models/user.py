@@ -1,15 +1,37 @@
-from beanie import Document
-from pydantic import Field
+from beanie import Document, PydanticObjectId
 from typing import Literal
-from pydantic import  EmailStr
+from pydantic import  BaseModel, ConfigDict, EmailStr, Field
 from bson import ObjectId
+from pymongo import IndexModel, ASCENDING
+from app.models.org import DEFAULT_ORG_ID
 
 class UserDB(Document):
+    org_id: str = DEFAULT_ORG_ID
     name: str
-    email: EmailStr = Field(..., unique=True)
+    email: EmailStr
     password_hashed: str  # stored securely 
     role: Literal["manager", "employee", "admin"]
 
     class Settings:
         name = "users"
-        bson_encoders = {ObjectId: str}
\ No newline at end of file
+        bson_encoders = {ObjectId: str}
+        indexes = [
+            # emails are unique within an org
+            IndexModel([("org_id", ASCENDING), ("email", ASCENDING)], unique=True),
+            # login doesn't know the org yet
+            IndexModel([("email", ASCENDING)], name="email_login"),
+        ]
+
+# what the profile cache holds: the hash is never projected, so it can't
+# end up in memory outside the login path
+class UserProfileView(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    id: PydanticObjectId = Field(alias="_id")
+    org_id: str = DEFAULT_ORG_ID
+    name: str
+    email: str
+    role: Literal["manager", "employee", "admin"]
+
+    class Settings:
+        projection = {"_id": 1, "org_id": 1, "name": 1, "email": 1, "role": 1}
@@ -0,0 +1,94 @@
+import argparse
+import asyncio
+import os
+from datetime import datetime, timedelta
+from pymongo import ASCENDING, ReplaceOne
+from app.core.database import init_db
+from app.models.feedback import FeedbackDB
+from app.models.archive import ArchivedFeedbackDB, ArchiveCheckpointDB
+from app.utils.archive import ARCHIVE_JOB
+
+# Moves acknowledged feedback older than FEEDBACK_ARCHIVE_AFTER_DAYS (by
+# acknowledged_at) from the hot collection into feedback_archive, in batches.
+# Each batch is upserted into the archive, then deleted from the hot
+# collection, then checkpointed, so a crash at any point is safe to rerun:
+# an unfinished run resumes from its checkpoint with its original cutoff.
+# Rollups are untouched; archived feedback still counts on the dashboard.
+#
+#   python -m app.scripts.archive_feedback [--older-than-days 365] [--batch-size 500]
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("FEEDBACK_ARCHIVE_AFTER_DAYS", "365"))
+BATCH_SIZE = int(os.getenv("FEEDBACK_ARCHIVE_BATCH_SIZE", "500"))
+
+
+async def _checkpoint(older_than_days: int) -> ArchiveCheckpointDB:
+    checkpoint = await ArchiveCheckpointDB.find_one(ArchiveCheckpointDB.job == ARCHIVE_JOB)
+    now = datetime.utcnow()
+    if checkpoint and checkpoint.finished_at is None:
+        return checkpoint
+
+    checkpoint = checkpoint or ArchiveCheckpointDB(job=ARCHIVE_JOB, cutoff=now, started_at=now, updated_at=now)
+    checkpoint.cutoff = now - timedelta(days=older_than_days)
+    checkpoint.last_acknowledged_at = None
+    checkpoint.last_id = None
+    checkpoint.archived = 0
+    checkpoint.started_at = now
+    checkpoint.updated_at = now
+    checkpoint.finished_at = None
+    await checkpoint.save()
+    return checkpoint
+
+
+def _batch_query(checkpoint: ArchiveCheckpointDB) -> dict:
+    query = {"status": "acknowledged", "acknowledged_at": {"$lt": checkpoint.cutoff}}
+    if checkpoint.last_id is not None:
+        # keyset on (acknowledged_at, _id), the order of the job's index
+        query["$or"] = [
+            {"acknowledged_at": {"$gt": checkpoint.last_acknowledged_at}},
+            {"acknowledged_at": checkpoint.last_acknowledged_at, "_id": {"$gt": checkpoint.last_id}},
+        ]
+    return query
+
+
+async def archive_feedback(older_than_days: int = ARCHIVE_AFTER_DAYS, batch_size: int = BATCH_SIZE) -> int:
+    checkpoint = await _checkpoint(older_than_days)
+    hot = FeedbackDB.get_motor_collection()
+    archive = ArchivedFeedbackDB.get_motor_collection()
+
+    while True:
+        docs = await hot.find(_batch_query(checkpoint)).sort(
+            [("acknowledged_at", ASCENDING), ("_id", ASCENDING)]
+        ).limit(batch_size).to_list(batch_size)
+        if not docs:
+            break
+
+        now = datetime.utcnow()
+        await archive.bulk_write(
+            [ReplaceOne({"org_id": doc["org_id"], "_id": doc["_id"]}, {**doc, "archived_at": now}, upsert=True) for doc in docs],
+            ordered=False
+        )
+        await hot.delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}, "status": "acknowledged"})
+
+        checkpoint.last_acknowledged_at = docs[-1]["acknowledged_at"]
+        checkpoint.last_id = docs[-1]["_id"]
+        checkpoint.archived += len(docs)
+        checkpoint.updated_at = now
+        await checkpoint.save()
+
+    checkpoint.finished_at = datetime.utcnow()
+    await checkpoint.save()
+    return checkpoint.archived
+
+
+async def main(older_than_days: int, batch_size: int):
+    await init_db()
+    count = await archive_feedback(older_than_days, batch_size)
+    print(f"archived {count} feedback documents")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive old acknowledged feedback")
+    parser.add_argument("--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+    asyncio.run(main(args.older_than_days, args.batch_size))
@@ -0,0 +1,89 @@
+import asyncio
+import sys
+from datetime import datetime
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+from app.core.database import init_db
+from app.models.user import UserDB
+from app.models.team import TeamDB
+from app.models.feedback import FeedbackDB
+from app.models.rollup import DashboardRollupDB
+from app.models.archive import ArchivedFeedbackDB
+from app.models.outbox import OutboxJobDB
+
+# Runs explain() on every query shape the routers issue and exits non-zero
+# if any of them falls back to a collection scan.
+#
+#   python -m app.scripts.explain_queries
+
+ORG = "default"
+EMAIL = "someone@example.com"
+NEWEST = [("updated_at", DESCENDING), ("_id", DESCENDING)]
+
+QUERY_SHAPES = [
+    ("login by email", UserDB, {"email": EMAIL}, None),
+    ("user by email", UserDB, {"org_id": ORG, "email": EMAIL}, None),
+    ("users by email list", UserDB, {"org_id": ORG, "email": {"$in": [EMAIL]}}, None),
+    ("team by member", TeamDB, {"org_id": ORG, "member_emails": EMAIL}, None),
+    ("team by manager", TeamDB, {"org_id": ORG, "manager_email": EMAIL}, None),
+    ("team by member or manager", TeamDB, {"org_id": ORG, "$or": [{"member_emails": EMAIL}, {"manager_email": EMAIL}]}, None),
+    ("feedback given", FeedbackDB, {"org_id": ORG, "created_by_email": EMAIL}, NEWEST),
+    ("feedback given or received", FeedbackDB, {"org_id": ORG, "$or": [{"employee_email": EMAIL}, {"created_by_email": EMAIL}]}, NEWEST),
+    ("feedback page after cursor", FeedbackDB, {"org_id": ORG, "$and": [
+        {"created_by_email": EMAIL},
+        {"$or": [
+            {"updated_at": {"$lt": datetime.utcnow()}},
+            {"updated_at": datetime.utcnow(), "_id": {"$lt": ObjectId()}},
+            {"updated_at": None},
+        ]},
+    ]}, NEWEST),
+    ("feedback received count", FeedbackDB, {"org_id": ORG, "employee_email": EMAIL}, None),
+    ("sentiment window", FeedbackDB, {"org_id": ORG, "created_by_email": EMAIL, "created_at": {"$gte": datetime.utcnow()}}, None),
+    ("timeline", FeedbackDB, {"org_id": ORG, "employee_email": EMAIL, "status": {"$in": ["submitted", "acknowledged"]}}, [("created_at", DESCENDING)]),
+    ("draft for recipient", FeedbackDB, {"org_id": ORG, "employee_email": EMAIL, "status": "draft"}, None),
+    ("rollup by key", DashboardRollupDB, {"org_id": ORG, "user_email": EMAIL, "role": "manager", "period": {"$in": ["2025-06"]}}, None),
+    ("keyword search", FeedbackDB, {"org_id": ORG, "$text": {"$search": "communication"}, "created_by_email": EMAIL}, None),
+    ("archive batch", FeedbackDB, {"status": "acknowledged", "acknowledged_at": {"$lt": datetime.utcnow()}}, [("acknowledged_at", ASCENDING), ("_id", ASCENDING)]),
+    ("archived feedback given", ArchivedFeedbackDB, {"org_id": ORG, "created_by_email": EMAIL}, NEWEST),
+    ("archived feedback given or received", ArchivedFeedbackDB, {"org_id": ORG, "$or": [{"employee_email": EMAIL}, {"created_by_email": EMAIL}]}, NEWEST),
+    ("archived timeline", ArchivedFeedbackDB, {"org_id": ORG, "employee_email": EMAIL, "status": {"$in": ["submitted", "acknowledged"]}}, [("created_at", DESCENDING)]),
+    ("due jobs", OutboxJobDB, {"$or": [
+        {"status": "pending", "run_at": {"$lte": datetime.utcnow()}},
+        {"status": "running", "locked_until": {"$lt": datetime.utcnow()}},
+    ]}, [("run_at", ASCENDING)]),
+    ("open request", FeedbackDB, {"org_id": ORG, "created_by_email": EMAIL, "employee_email": EMAIL, "status": {"$in": ["requested", "draft"]}}, None),
+]
+
+
+def find_stages(plan, stage):
+    if isinstance(plan, dict):
+        if plan.get("stage") == stage:
+            yield plan
+        for value in plan.values():
+            yield from find_stages(value, stage)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from find_stages(item, stage)
+
+
+async def explain_all():
+    await init_db()
+
+    failures = []
+    for name, model, query, sort in QUERY_SHAPES:
+        cursor = model.get_motor_collection().find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = await cursor.explain()
+
+        scans = list(find_stages(plan["queryPlanner"]["winningPlan"], "COLLSCAN"))
+        print(f"{'COLLSCAN' if scans else 'ok':8} {model.Settings.name}: {name}")
+        if scans:
+            failures.append(name)
+
+    return failures
+
+
+if __name__ == "__main__":
+    failures = asyncio.run(explain_all())
+    sys.exit(1 if failures else 0)
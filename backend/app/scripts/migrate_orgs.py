@@ -0,0 +1,45 @@
+import argparse
+import asyncio
+import os
+from app.core.database import get_client, init_db, migrate_org_partitioning
+from app.models.org import SHARD_KEYS
+
+# Moves a pre-partitioning database onto org_id: documents without an org
+# join DEFAULT_ORG_ID and the email-led indexes are swapped for org-led
+# ones. init_db does the same on every startup; this script reports what it
+# changed and, with --shard on a mongos, shards the tenant collections on
+# SHARD_KEYS. Sharding needs an index on each key, created here when the
+# models don't already declare one. Sharded deployments need MongoDB 5.1+
+# ($lookup from the sharded users collection).
+#
+#   python -m app.scripts.migrate_orgs [--shard]
+
+
+async def shard_collections(db) -> list:
+    admin = db.client.admin
+    await admin.command("enableSharding", db.name)
+    sharded = []
+    for name, key in SHARD_KEYS.items():
+        await db[name].create_index(list(key.items()))
+        await admin.command("shardCollection", f"{db.name}.{name}", key=key)
+        sharded.append(name)
+    return sharded
+
+
+async def main(shard: bool):
+    db = get_client()[os.getenv("DATABASE_NAME")]
+    backfilled = await migrate_org_partitioning(db)
+    await init_db()
+    for name, count in backfilled.items():
+        print(f"{name}: assigned {count} documents to the default org")
+
+    if shard:
+        for name in await shard_collections(db):
+            print(f"sharded {name} on {SHARD_KEYS[name]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Partition existing data by org_id")
+    parser.add_argument("--shard", action="store_true", help="shard the tenant collections (mongos only)")
+    args = parser.parse_args()
+    asyncio.run(main(args.shard))
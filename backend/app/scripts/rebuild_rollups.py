@@ -0,0 +1,97 @@
+import asyncio
+from collections import defaultdict
+from app.core.database import init_db
+from app.models.feedback import FeedbackDB
+from app.models.rollup import DashboardRollupDB
+from app.utils.periods import period_expression
+from app.utils.rollups import ALL_TIME, RECIPIENT_ROLE
+from app.utils.archive import ARCHIVE_COLLECTION
+
+# Recomputes dashboard_rollups from the feedback and archive collections, for the initial
+# backfill and to repair drift. The new rollups are written to a scratch
+# collection and swapped in with a rename, so readers never see a partial set.
+# Increments that land while the rebuild runs are lost; run it off-peak.
+#
+#   python -m app.scripts.rebuild_rollups
+
+SIDES = [
+    ("given", "$created_by_email", "$created_by_role"),
+    ("received", "$employee_email", RECIPIENT_ROLE),
+]
+
+
+def _empty_counts():
+    return {"total": 0, "sentiment": defaultdict(int), "status": defaultdict(int)}
+
+
+def _empty_rollup(org_id, email, role, period):
+    return {
+        "org_id": org_id,
+        "user_email": email,
+        "role": role,
+        "period": period,
+        "given": _empty_counts(),
+        "received": _empty_counts(),
+    }
+
+
+async def rebuild_rollups() -> int:
+    rollups = {}
+    feedback = FeedbackDB.get_motor_collection()
+    # skipped while nothing is archived, which also keeps mongomock (no
+    # $unionWith support) working for benchmarks.run --mock
+    archived = await feedback.database[ARCHIVE_COLLECTION].estimated_document_count()
+    union = [{"$unionWith": {"coll": ARCHIVE_COLLECTION}}] if archived else []
+
+    for side, email_field, role_field in SIDES:
+        pipeline = [
+            *union,
+            {"$group": {
+                "_id": {
+                    "org_id": "$org_id",
+                    "email": email_field,
+                    "role": role_field,
+                    "period": period_expression("month"),
+                    "sentiment": {"$ifNull": ["$sentiment", "neutral"]},
+                    "status": "$status",
+                },
+                "count": {"$sum": 1},
+            }},
+        ]
+        async for row in feedback.aggregate(pipeline, allowDiskUse=True):
+            key = row["_id"]
+            periods = [ALL_TIME] + ([key["period"]] if key.get("period") else [])
+            for period in periods:
+                rollup_key = (key["org_id"], key["email"], key["role"], period)
+                if rollup_key not in rollups:
+                    rollups[rollup_key] = _empty_rollup(*rollup_key)
+                counts = rollups[rollup_key][side]
+                counts["total"] += row["count"]
+                counts["sentiment"][key["sentiment"]] += row["count"]
+                counts["status"][key["status"]] += row["count"]
+
+    target = DashboardRollupDB.get_motor_collection()
+    scratch = target.database[f"{target.name}_rebuild"]
+    await scratch.drop()
+    await scratch.create_indexes(DashboardRollupDB.Settings.indexes)
+
+    docs = list(rollups.values())
+    for start in range(0, len(docs), 1000):
+        await scratch.insert_many(docs[start:start + 1000], ordered=False)
+
+    if docs:
+        await scratch.rename(target.name, dropTarget=True)
+    else:
+        await target.delete_many({})
+
+    return len(docs)
+
+
+async def main():
+    await init_db()
+    count = await rebuild_rollups()
+    print(f"rebuilt {count} rollup documents")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,36 @@
+from typing import List, Optional
+from bson import ObjectId
+from app.models.feedback import FeedbackDB
+from app.models.archive import ArchivedFeedbackDB, ArchiveCheckpointDB
+
+# Reads that span the hot and archive collections.
+
+ARCHIVE_COLLECTION = ArchivedFeedbackDB.Settings.name
+ARCHIVE_JOB = "feedback"
+
+
+def union_archive(match: dict, stages: List[dict] = ()) -> List[dict]:
+    # `stages` (usually a sort and limit) run on both sides before the union,
+    # so each collection answers from its own index and the merge stays small
+    return [
+        {"$match": match},
+        *stages,
+        {"$unionWith": {"coll": ARCHIVE_COLLECTION, "pipeline": [{"$match": match}, *stages]}},
+    ]
+
+
+async def archive_generation() -> list:
+    # moves with every archive batch, so cached lists that still show
+    # archived rows revalidate even when nothing newer was written
+    checkpoint = await ArchiveCheckpointDB.get_motor_collection().find_one(
+        {"job": ARCHIVE_JOB}, {"_id": 0, "archived": 1, "updated_at": 1}
+    )
+    return [checkpoint.get("archived"), checkpoint.get("updated_at")] if checkpoint else []
+
+
+async def get_feedback_any(org_id: str, feedback_id: ObjectId) -> Optional[FeedbackDB]:
+    query = {"_id": feedback_id, "org_id": org_id}
+    feedback = await FeedbackDB.find_one(query)
+    if feedback is None:
+        feedback = await ArchivedFeedbackDB.find_one(query)
+    return feedback
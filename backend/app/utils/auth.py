@@ -1,4 +1,16 @@
+import asyncio
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Deque, List, Literal, Optional
+import jwt
+from fastapi import Depends, HTTPException, Query
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from passlib.context import CryptContext
+from pydantic import BaseModel
+from app.models.org import DEFAULT_ORG_ID
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -8,3 +20,183 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+
+class HashExecutor:
+    # bcrypt burns ~250ms of CPU per call, so it runs on a bounded pool instead
+    # of the event loop. At most `workers` calls run at once; callers beyond
+    # that wait in line, and past `max_queue` waiting interactive callers we
+    # shed load with 503. Bulk callers wait in a separate line that is only
+    # served when no interactive caller is waiting, and is never shed.
+    def __init__(self, kind: str, workers: int, max_queue: int):
+        self.kind = kind
+        self.workers = workers
+        self.max_queue = max_queue
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self._pool: Optional[Executor] = None
+        self._free = workers
+        self._interactive: Deque[asyncio.Future] = deque()
+        self._bulk: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._interactive)
+
+    @property
+    def bulk_queued(self) -> int:
+        return len(self._bulk)
+
+    async def _acquire(self, line: Deque[asyncio.Future]):
+        if self._free > 0 and not self._interactive and not self._bulk:
+            self._free -= 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        line.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # handed a slot just as we were cancelled, pass it on
+                self._release()
+            else:
+                line.remove(waiter)
+            raise
+
+    def _release(self):
+        for line in (self._interactive, self._bulk):
+            while line:
+                waiter = line.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+                    return
+        self._free += 1
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == "thread":
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hash")
+            else:
+                # the pool starts after motor's threads are running, and
+                # forking a threaded process can deadlock the child
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("forkserver")
+                )
+        return self._pool
+
+    async def run(self, fn, *args, bulk: bool = False):
+        if not bulk and self.queued >= self.max_queue:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Server busy, try again shortly", headers={"Retry-After": "1"})
+
+        await self._acquire(self._bulk if bulk else self._interactive)
+
+        self.running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_pool(), fn, *args)
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self._release()
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "queued": self.queued,
+            "bulk_queued": self.bulk_queued,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+hasher = HashExecutor(
+    kind=os.getenv("HASH_EXECUTOR", "process"),
+    workers=int(os.getenv("HASH_WORKERS", os.cpu_count() or 1)),
+    max_queue=int(os.getenv("HASH_MAX_QUEUE", "256")),
+)
+
+async def hash_password_async(password: str) -> str:
+    return await hasher.run(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await hasher.run(verify_password, plain_password, hashed_password)
+
+async def hash_passwords(passwords: List[str]) -> List[str]:
+    # bulk jobs queue behind interactive logins rather than being shed
+    return await asyncio.gather(*(hasher.run(hash_password, p, bulk=True) for p in passwords))
+
+
+# signed session tokens carry the caller's identity, so routes can trust it
+# without looking the user up again on every request
+SECRET_KEY = os.getenv("SECRET_KEY")
+ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "480"))
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+class CurrentUser(BaseModel):
+    email: str
+    name: str
+    role: Literal["manager", "employee", "admin"]
+    org_id: str = DEFAULT_ORG_ID
+
+def create_access_token(user) -> str:
+    if not SECRET_KEY:
+        raise HTTPException(status_code=500, detail="SECRET_KEY is not configured")
+    expires_at = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    payload = {"sub": user.email, "name": user.name, "role": user.role, "org": user.org_id, "exp": expires_at}
+    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+
+def decode_access_token(token: str) -> CurrentUser:
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        # tokens issued before org partitioning carry no org claim
+        return CurrentUser(
+            email=payload["sub"],
+            name=payload["name"],
+            role=payload["role"],
+            org_id=payload.get("org", DEFAULT_ORG_ID)
+        )
+    except (jwt.PyJWTError, KeyError, ValueError):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+async def get_current_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)) -> CurrentUser:
+    if credentials is None or not SECRET_KEY:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    return decode_access_token(credentials.credentials)
+
+async def get_stream_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+    access_token: Optional[str] = Query(None)
+) -> CurrentUser:
+    # EventSource can't send headers, so streams also accept ?access_token=
+    if credentials is None and access_token:
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=access_token)
+    return await get_current_user(credentials)
+
+async def get_org_id(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)) -> str:
+    # routes that still accept anonymous calls act in the caller's org when
+    # a token is sent, and in the default org otherwise
+    if credentials is None or not SECRET_KEY:
+        return DEFAULT_ORG_ID
+    return decode_access_token(credentials.credentials).org_id
+
+def require_role(*roles: str):
+    async def dependency(user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+        if user.role not in roles:
+            raise HTTPException(status_code=403, detail="Access denied")
+        return user
+    return dependency
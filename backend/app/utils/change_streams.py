@@ -0,0 +1,67 @@
+import asyncio
+import logging
+from typing import Callable, Optional
+from pymongo.errors import OperationFailure
+
+# Background task tailing a collection's change stream, for the workers that
+# need to see writes made by other processes (SSE fan-out, cache
+# invalidation). It resumes where it left off after a dropped connection,
+# and starts from now when the oplog no longer has the resume point.
+
+logger = logging.getLogger(__name__)
+
+CHANGE_STREAM_HISTORY_LOST = 286
+
+
+class ChangeStreamWatcher:
+    def __init__(
+        self,
+        get_collection: Callable,
+        pipeline: list,
+        on_change: Callable[[dict], None],
+        on_gap: Optional[Callable[[], None]] = None,
+    ):
+        # on_gap runs whenever changes may have been missed
+        self.get_collection = get_collection
+        self.pipeline = pipeline
+        self.on_change = on_change
+        self.on_gap = on_gap
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _watch(self):
+        collection = self.get_collection()
+        resume_token = None
+        while True:
+            try:
+                async with collection.watch(
+                    self.pipeline, full_document="updateLookup", resume_after=resume_token
+                ) as stream:
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        self.on_change(change)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.exception("%s change stream failed, reconnecting", collection.name)
+                if isinstance(exc, OperationFailure) and exc.code == CHANGE_STREAM_HISTORY_LOST:
+                    resume_token = None
+                    if self.on_gap is not None:
+                        self.on_gap()
+                await asyncio.sleep(1)
@@ -0,0 +1,53 @@
+import asyncio
+import hashlib
+import json
+from typing import Optional
+from fastapi import Request, Response
+from pymongo import DESCENDING
+from app.models.feedback import FeedbackDB
+from app.utils.rollups import get_rollup
+from app.utils.archive import archive_generation
+from app.core.database import analytics_collection
+
+# Conditional GET support. A handler computes a cheap version token for the
+# caller's scope, and if the client already holds it we answer 304 before
+# building any DTOs.
+
+
+def make_etag(*parts) -> str:
+    raw = json.dumps(parts, default=str, sort_keys=True, separators=(",", ":"))
+    return f'W/"{hashlib.sha1(raw.encode()).hexdigest()}"'
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    # returns a 304 when If-None-Match matches, otherwise tags the real response
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    candidates = request.headers.get("if-none-match", "")
+    tags = {tag.strip().removeprefix("W/") for tag in candidates.split(",") if tag.strip()}
+    if "*" in tags or etag.removeprefix("W/") in tags:
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return None
+
+
+async def feedback_version(org_id: str, email: str, role: str, query: dict, secondary_ok: bool = False) -> list:
+    # newest updated_at and the document count in scope (both index-only)
+    # change inside the writing request: every update bumps updated_at and
+    # deletes drop the count. The rollup is applied later by a job, so it is
+    # included only so that endpoints reading it revalidate once it lands.
+    # The archive generation covers rows the archive job moved out of scope.
+    collection = analytics_collection(FeedbackDB) if secondary_ok else FeedbackDB.get_motor_collection()
+    latest, count, rollup, archived = await asyncio.gather(
+        collection.find(query, {"_id": 0, "updated_at": 1}).sort("updated_at", DESCENDING).limit(1).to_list(1),
+        collection.count_documents(query),
+        get_rollup(org_id, email, role, secondary_ok=secondary_ok),
+        archive_generation(),
+    )
+    return [
+        latest[0].get("updated_at") if latest else None,
+        count,
+        archived,
+        rollup.given.model_dump(),
+        rollup.received.model_dump(),
+    ]
@@ -0,0 +1,109 @@
+import asyncio
+import os
+from collections import defaultdict
+from typing import Dict, Iterable, Set, Tuple
+from app.models.feedback import FeedbackDB
+from app.utils.change_streams import ChangeStreamWatcher
+
+# Per-user feedback notifications for /feedback/events. Write handlers publish
+# to an in-process broker that fans out to the SSE subscribers of the creator
+# and the recipient. With several workers each process only sees its own
+# writes, so FEEDBACK_EVENTS_CHANGE_STREAM=1 switches the source to a Mongo
+# change stream (replica set required) that every worker tails instead.
+
+QUEUE_SIZE = int(os.getenv("FEEDBACK_EVENTS_QUEUE_SIZE", "100"))
+USE_CHANGE_STREAM = os.getenv("FEEDBACK_EVENTS_CHANGE_STREAM", "0") == "1"
+
+
+def feedback_event(kind: str, fb: FeedbackDB) -> dict:
+    # ids and status only, clients refetch what they are allowed to see
+    return {
+        "type": kind,
+        "id": str(fb.id),
+        "status": fb.status,
+        "updated_at": fb.updated_at.isoformat() if fb.updated_at else None,
+    }
+
+
+class EventBroker:
+    def __init__(self, queue_size: int = QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Dict[Tuple[str, str], Set[asyncio.Queue]] = defaultdict(set)
+        self._watcher = ChangeStreamWatcher(
+            FeedbackDB.get_motor_collection,
+            [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}],
+            self._on_change,
+            on_gap=self._resync_all,
+        )
+        self.dropped = 0
+
+    def subscribe(self, org_id: str, email: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[(org_id, email)].add(queue)
+        return queue
+
+    def unsubscribe(self, org_id: str, email: str, queue: asyncio.Queue):
+        key = (org_id, email)
+        queues = self._subscribers.get(key)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[key]
+
+    def _deliver(self, org_id: str, emails: Iterable[str], event: dict):
+        for email in set(emails):
+            for queue in self._subscribers.get((org_id, email), ()):
+                try:
+                    queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    # a stalled client gets one resync instead of a backlog
+                    self.dropped += 1
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait({"type": "resync"})
+
+    def publish(self, kind: str, fb: FeedbackDB):
+        # the change stream delivers this write to every worker, this one included
+        if self._watcher.running:
+            return
+        self._deliver(fb.org_id, [fb.created_by_email, fb.employee_email], feedback_event(kind, fb))
+
+    def start(self):
+        if USE_CHANGE_STREAM:
+            self._watcher.start()
+
+    async def stop(self):
+        await self._watcher.stop()
+
+    def _resync_all(self):
+        # changes were missed, every subscriber refetches
+        for queues in self._subscribers.values():
+            for queue in queues:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"type": "resync"})
+
+    def _on_change(self, change: dict):
+        doc = change.get("fullDocument")
+        if not doc:
+            return
+        fb = FeedbackDB.model_validate(doc)
+        if change["operationType"] == "insert":
+            kind = "requested" if fb.status == "requested" else "created"
+        elif fb.status == "acknowledged" and "status" in change.get("updateDescription", {}).get("updatedFields", {}):
+            kind = "acknowledged"
+        else:
+            kind = "updated"
+        self._deliver(fb.org_id, [fb.created_by_email, fb.employee_email], feedback_event(kind, fb))
+
+    def stats(self) -> dict:
+        return {
+            "source": "change_stream" if self._watcher.running else "local",
+            "users": len(self._subscribers),
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+            "dropped": self.dropped,
+        }
+
+
+events = EventBroker()
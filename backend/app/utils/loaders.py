@@ -0,0 +1,34 @@
+from typing import Dict, Iterable, Optional
+from fastapi import Depends
+from app.models.user import UserProfileView
+from app.utils.auth import CurrentUser, get_current_user
+from app.utils.user_cache import user_cache
+
+
+class UserLoader:
+    # request scoped: collects the emails a handler needs, resolves them
+    # through the profile cache (one $in for the misses) and memoizes the
+    # result for the rest of the request
+    def __init__(self, org_id: str):
+        self.org_id = org_id
+        self._users: Dict[str, Optional[UserProfileView]] = {}
+
+    async def load_many(self, emails: Iterable[str]) -> Dict[str, Optional[UserProfileView]]:
+        wanted = {email for email in emails if email}
+        missing = [email for email in wanted if email not in self._users]
+
+        if missing:
+            self._users.update(await user_cache.lookup_many(self.org_id, missing))
+
+        return {email: self._users[email] for email in wanted}
+
+    async def load(self, email: str) -> Optional[UserProfileView]:
+        return (await self.load_many([email])).get(email)
+
+    def name(self, email: str, default: str = "Invalid") -> str:
+        user = self._users.get(email)
+        return user.name if user else default
+
+
+def get_user_loader(user: CurrentUser = Depends(get_current_user)) -> UserLoader:
+    return UserLoader(user.org_id)
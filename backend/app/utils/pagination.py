@@ -0,0 +1,38 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+
+# opaque keyset cursor built from (updated_at, _id) of the last item on a page
+
+def encode_cursor(updated_at: Optional[datetime], doc_id: ObjectId) -> str:
+    payload = {"u": updated_at.isoformat() if updated_at else None, "i": str(doc_id)}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        updated_at = datetime.fromisoformat(payload["u"]) if payload["u"] else None
+        return updated_at, ObjectId(payload["i"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_filter(cursor: str) -> dict:
+    # documents strictly after the cursor in (updated_at desc, _id desc) order;
+    # missing updated_at sorts last, so those documents always follow a dated cursor
+    updated_at, doc_id = decode_cursor(cursor)
+    if updated_at is None:
+        return {"updated_at": None, "_id": {"$lt": doc_id}}
+
+    return {"$or": [
+        {"updated_at": {"$lt": updated_at}},
+        {"updated_at": updated_at, "_id": {"$lt": doc_id}},
+        {"updated_at": None},
+    ]}
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+from typing import Literal
+
+Granularity = Literal["week", "month", "quarter"]
+
+
+def _shift_months(dt: datetime, months: int) -> datetime:
+    index = dt.year * 12 + dt.month - 1 - months
+    return dt.replace(year=index // 12, month=index % 12 + 1)
+
+
+def window_start(granularity: Granularity, window: int, now: datetime) -> datetime:
+    # start of the oldest period in a window of `window` periods ending with the current one
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "week":
+        monday = today - timedelta(days=today.weekday())
+        return monday - timedelta(weeks=window - 1)
+
+    first_of_month = today.replace(day=1)
+    if granularity == "quarter":
+        first_of_quarter = first_of_month.replace(month=(first_of_month.month - 1) // 3 * 3 + 1)
+        return _shift_months(first_of_quarter, 3 * (window - 1))
+    return _shift_months(first_of_month, window - 1)
+
+
+def period_key(granularity: Granularity, dt: datetime) -> str:
+    # python twin of period_expression, e.g. '2025-06', '2025-W23', '2025-Q2'
+    if granularity == "week":
+        year, week, _ = dt.isocalendar()
+        return f"{year}-W{week:02d}"
+    if granularity == "quarter":
+        return f"{dt.year}-Q{(dt.month - 1) // 3 + 1}"
+    return dt.strftime("%Y-%m")
+
+
+def period_expression(granularity: Granularity, field: str = "$created_at") -> dict:
+    if granularity == "week":
+        return {"$dateToString": {"format": "%G-W%V", "date": field}}
+    if granularity == "quarter":
+        quarter = {"$toInt": {"$ceil": {"$divide": [{"$month": field}, 3]}}}
+        return {"$concat": [
+            {"$dateToString": {"format": "%Y", "date": field}},
+            "-Q",
+            {"$toString": quarter},
+        ]}
+    return {"$dateToString": {"format": "%Y-%m", "date": field}}
+
+
+def month_starts(start: datetime, end: datetime):
+    month = start.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    while month <= end:
+        yield month
+        month = _shift_months(month, -1)
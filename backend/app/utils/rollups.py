@@ -0,0 +1,93 @@
+from collections import defaultdict
+from typing import Iterable, Optional, Tuple
+from pymongo import UpdateOne
+from app.models.feedback import FeedbackDB
+from app.models.rollup import DashboardRollupDB
+from app.models.org import DEFAULT_ORG_ID
+from app.core.database import analytics_collection
+from app.core.jobs import enqueue, job_handler
+
+# Dashboard counters are kept in dashboard_rollups and moved with $inc on
+# every feedback write. Handlers take a snapshot before and after the write
+# and queue_change hands the pair to the job queue, whose worker applies the
+# difference with record_changes. Drift (a crash between the two writes, a
+# job retried after a partial write, manual edits) is repaired with
+# `python -m app.scripts.rebuild_rollups`.
+
+ALL_TIME = "all"
+
+# feedback only goes to team members, who are always employees
+RECIPIENT_ROLE = "employee"
+
+
+def snapshot(fb: Optional[FeedbackDB]) -> Optional[dict]:
+    if fb is None:
+        return None
+    return {
+        "org_id": fb.org_id,
+        "created_by_email": fb.created_by_email,
+        "created_by_role": fb.created_by_role,
+        "employee_email": fb.employee_email,
+        "sentiment": fb.sentiment or "neutral",
+        "status": fb.status,
+        "period": fb.created_at.strftime("%Y-%m") if fb.created_at else None,
+    }
+
+
+def _add(incs, fb: dict, sign: int):
+    periods = [ALL_TIME] + ([fb["period"]] if fb["period"] else [])
+    sides = [
+        ("given", fb["created_by_email"], fb["created_by_role"]),
+        ("received", fb["employee_email"], RECIPIENT_ROLE),
+    ]
+    # snapshots queued before org partitioning carry no org_id
+    org_id = fb.get("org_id", DEFAULT_ORG_ID)
+    for side, email, role in sides:
+        for period in periods:
+            inc = incs[(org_id, email, role, period)]
+            inc[f"{side}.total"] += sign
+            inc[f"{side}.sentiment.{fb['sentiment']}"] += sign
+            inc[f"{side}.status.{fb['status']}"] += sign
+
+
+async def queue_change(before: Optional[dict], after: Optional[dict]):
+    await queue_changes([(before, after)])
+
+
+async def queue_changes(changes: Iterable[Tuple[Optional[dict], Optional[dict]]]):
+    # one outbox job per write, applied off the request path by the job workers
+    await enqueue("rollups", {"changes": [[before, after] for before, after in changes]})
+
+
+@job_handler("rollups")
+async def apply_rollup_job(payload: dict):
+    await record_changes(payload["changes"])
+
+
+async def record_changes(changes: Iterable[Tuple[Optional[dict], Optional[dict]]]):
+    incs = defaultdict(lambda: defaultdict(int))
+    for before, after in changes:
+        if before:
+            _add(incs, before, -1)
+        if after:
+            _add(incs, after, 1)
+
+    ops = []
+    for (org_id, email, role, period), inc in incs.items():
+        inc = {field: value for field, value in inc.items() if value}
+        if inc:
+            key = {"org_id": org_id, "user_email": email, "role": role, "period": period}
+            ops.append(UpdateOne(key, {"$inc": inc}, upsert=True))
+
+    if ops:
+        await DashboardRollupDB.get_motor_collection().bulk_write(ops, ordered=False)
+
+
+async def get_rollup(org_id: str, email: str, role: str, period: str = ALL_TIME, secondary_ok: bool = False) -> DashboardRollupDB:
+    query = {"org_id": org_id, "user_email": email, "role": role, "period": period}
+    if secondary_ok:
+        doc = await analytics_collection(DashboardRollupDB).find_one(query)
+        rollup = DashboardRollupDB.model_validate(doc) if doc else None
+    else:
+        rollup = await DashboardRollupDB.find_one(query)
+    return rollup or DashboardRollupDB(org_id=org_id, user_email=email, role=role, period=period)
@@ -0,0 +1,88 @@
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+from app.models.team import TeamDB
+from app.utils.lru import TTLCache
+
+# Process-local (org_id, email) -> team index. Teams change far less often than
+# feedback is written, so the write path validates membership from here.
+# Entries expire after TEAM_CACHE_TTL_SECONDS, which also bounds how stale a
+# worker can be when another worker edits a team; edits made through this
+# process invalidate the affected emails immediately.
+
+
+@dataclass(frozen=True)
+class TeamSnapshot:
+    id: str
+    manager_email: str
+    member_emails: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class Membership:
+    as_member: Optional[TeamSnapshot] = None
+    as_manager: Optional[TeamSnapshot] = None
+
+    @property
+    def team(self) -> Optional[TeamSnapshot]:
+        return self.as_member or self.as_manager
+
+
+def same_team(a: Optional[TeamSnapshot], b: Optional[TeamSnapshot]) -> bool:
+    # by id: snapshots of one team cached before and after an edit differ
+    # in member_emails but are still the same team
+    return (a.id if a else None) == (b.id if b else None)
+
+
+def _snapshot(team: TeamDB) -> TeamSnapshot:
+    return TeamSnapshot(
+        id=str(team.id),
+        manager_email=team.manager_email,
+        member_emails=tuple(team.member_emails),
+    )
+
+
+class TeamMembershipCache(TTLCache):
+    async def lookup_many(self, org_id: str, emails: Iterable[str]) -> Dict[str, Membership]:
+        result = {}
+        missing = []
+        for email in set(emails):
+            membership = self.get((org_id, email))
+            if membership is None:
+                missing.append(email)
+            else:
+                result[email] = membership
+
+        if missing:
+            teams = await TeamDB.find({"org_id": org_id, "$or": [
+                {"member_emails": {"$in": missing}},
+                {"manager_email": {"$in": missing}},
+            ]}).to_list()
+
+            for email in missing:
+                as_member = next((t for t in teams if email in t.member_emails), None)
+                as_manager = next((t for t in teams if t.manager_email == email), None)
+                membership = Membership(
+                    as_member=_snapshot(as_member) if as_member else None,
+                    as_manager=_snapshot(as_manager) if as_manager else None,
+                )
+                self.put((org_id, email), membership)
+                result[email] = membership
+
+        return result
+
+    async def lookup(self, org_id: str, email: str) -> Membership:
+        return (await self.lookup_many(org_id, [email]))[email]
+
+    def invalidate(self, org_id: str, emails: Optional[Iterable[str]] = None):
+        if emails is None:
+            self.discard(lambda key: key[0] == org_id)
+            return
+        for email in emails:
+            self.pop((org_id, email))
+
+
+team_cache = TeamMembershipCache(
+    ttl_seconds=float(os.getenv("TEAM_CACHE_TTL_SECONDS", "60")),
+    max_size=int(os.getenv("TEAM_CACHE_MAX_SIZE", "10000")),
+)
@@ -0,0 +1,69 @@
+from typing import List, Optional, Tuple
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+from app.models.feedback import FeedbackDB
+
+# Feedback status machine. Every write is a single conditional
+# find_one_and_update: the filter carries the statuses the move is allowed
+# from, and the update $sets only the changed fields. Two racing writers
+# can't both win, and the loser sees None instead of overwriting.
+
+TRANSITIONS = {
+    "requested": {"draft", "submitted"},
+    "draft": {"draft", "submitted"},
+    "submitted": {"submitted", "acknowledged"},
+    "acknowledged": set(),
+}
+
+
+def allowed_from(target: Optional[str]) -> List[str]:
+    # target None is a content edit that keeps the current status
+    if target is None:
+        return [status for status, targets in TRANSITIONS.items() if status in targets]
+    return [status for status, targets in TRANSITIONS.items() if target in targets]
+
+
+def parse_feedback_id(feedback_id: str) -> ObjectId:
+    try:
+        return ObjectId(feedback_id)
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=404, detail="Feedback not found")
+
+
+async def transition(
+    org_id: str,
+    feedback_id: str,
+    target: Optional[str],
+    fields: dict,
+    match: Optional[dict] = None
+) -> Optional[Tuple[FeedbackDB, FeedbackDB]]:
+    # returns (before, after), or None when the feedback is missing, doesn't
+    # satisfy `match`, or its status doesn't allow the move
+    update = dict(fields)
+    if target is not None:
+        update["status"] = target
+
+    doc = await FeedbackDB.get_motor_collection().find_one_and_update(
+        {"_id": parse_feedback_id(feedback_id), "org_id": org_id, "status": {"$in": allowed_from(target)}, **(match or {})},
+        {"$set": update},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if doc is None:
+        return None
+
+    before = FeedbackDB.model_validate(doc)
+    return before, before.model_copy(update=update)
+
+
+async def find_feedback(org_id: str, feedback_id: str) -> Optional[FeedbackDB]:
+    return await FeedbackDB.find_one({"_id": parse_feedback_id(feedback_id), "org_id": org_id})
+
+
+def rejected(current: Optional[FeedbackDB], target: Optional[str]) -> HTTPException:
+    if current is None:
+        return HTTPException(status_code=404, detail="Feedback not found")
+    if target is None or current.status == target:
+        return HTTPException(status_code=409, detail=f"Cannot update {current.status} feedback")
+    return HTTPException(status_code=409, detail=f"Cannot move feedback from {current.status} to {target}")
@@ -0,0 +1,98 @@
+import os
+from typing import Dict, Iterable, Optional
+from app.models.user import UserDB, UserProfileView
+from app.utils.change_streams import ChangeStreamWatcher
+from app.utils.lru import TTLCache
+
+# Process-local (org_id, email) -> public profile, read through on miss. Most
+# handlers start by resolving one or two users by email and profiles almost
+# never change, so those lookups are served from here. Unknown emails are not
+# cached, so a fresh registration is visible to every worker at once.
+# Writes through this process invalidate their entries immediately; other
+# workers catch up after USER_CACHE_TTL_SECONDS, or right away with
+# USER_CACHE_CHANGE_STREAM=1, which tails the users change stream (replica
+# set required) as the invalidation channel.
+
+USE_CHANGE_STREAM = os.getenv("USER_CACHE_CHANGE_STREAM", "0") == "1"
+
+
+class UserProfileCache(TTLCache):
+    def __init__(self, ttl_seconds: float, max_size: int):
+        super().__init__(ttl_seconds, max_size)
+        self.invalidations = 0
+        self._watcher = ChangeStreamWatcher(
+            UserDB.get_motor_collection,
+            [{"$match": {"operationType": {"$in": ["update", "replace", "delete", "drop", "rename", "invalidate"]}}}],
+            self._on_change,
+            on_gap=self.invalidate,
+        )
+
+    async def lookup_many(self, org_id: str, emails: Iterable[str]) -> Dict[str, Optional[UserProfileView]]:
+        # every requested email gets a key, None when there's no such user
+        result = {}
+        missing = []
+        for email in set(emails):
+            if not email:
+                result[email] = None
+                continue
+            profile = self.get((org_id, email))
+            if profile is None:
+                missing.append(email)
+            else:
+                result[email] = profile
+
+        if missing:
+            found = await UserDB.find(
+                {"org_id": org_id, "email": {"$in": missing}}, projection_model=UserProfileView
+            ).to_list()
+            for profile in found:
+                self.put((org_id, profile.email), profile)
+                result[profile.email] = profile
+            for email in missing:
+                result.setdefault(email, None)
+
+        return result
+
+    async def lookup(self, org_id: str, email: str) -> Optional[UserProfileView]:
+        return (await self.lookup_many(org_id, [email])).get(email)
+
+    def invalidate(self, org_id: Optional[str] = None, emails: Optional[Iterable[str]] = None):
+        # no org clears everything, no emails clears the org
+        self.invalidations += 1
+        if org_id is None:
+            self.discard()
+            return
+        if emails is None:
+            self.discard(lambda key: key[0] == org_id)
+            return
+        for email in emails:
+            self.pop((org_id, email))
+
+    def start(self):
+        if USE_CHANGE_STREAM:
+            self._watcher.start()
+
+    async def stop(self):
+        await self._watcher.stop()
+
+    def _on_change(self, change: dict):
+        doc = change.get("fullDocument")
+        renamed = "email" in change.get("updateDescription", {}).get("updatedFields", {})
+        # deletes only carry the _id, and a changed email leaves the old key behind
+        if not doc or renamed:
+            self.invalidate()
+            return
+        self.invalidate(doc.get("org_id"), [doc.get("email")])
+
+    def stats(self) -> dict:
+        return {
+            "source": "change_stream" if self._watcher.running else "ttl",
+            **super().stats(),
+            "invalidations": self.invalidations,
+        }
+
+
+user_cache = UserProfileCache(
+    ttl_seconds=float(os.getenv("USER_CACHE_TTL_SECONDS", "300")),
+    max_size=int(os.getenv("USER_CACHE_MAX_SIZE", "10000")),
+)
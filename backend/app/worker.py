@@ -0,0 +1,35 @@
+import asyncio
+import logging
+import os
+import signal
+from prometheus_client import start_http_server
+from app.core.database import init_db, close_db
+from app.core.jobs import JobWorker
+# job handlers register themselves when their modules are imported
+import app.utils.rollups  # noqa: F401
+
+# Standalone job worker for JOBS_MODE=external deployments, where the API
+# processes only enqueue. Exposes its own Prometheus metrics.
+#
+#   python -m app.worker
+
+async def main():
+    logging.basicConfig(level=logging.INFO)
+    await init_db()
+    start_http_server(int(os.getenv("JOBS_METRICS_PORT", "9101")))
+
+    worker = JobWorker()
+    worker.start()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
+
+    await worker.stop()
+    close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
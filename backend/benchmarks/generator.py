@@ -0,0 +1,102 @@
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List
+from app.models.user import UserDB
+from app.models.team import TeamDB
+from app.models.feedback import FeedbackDB
+from app.utils.auth import hash_password
+from app.scripts.rebuild_rollups import rebuild_rollups
+
+# Builds a synthetic org through the real Beanie models:
+# teams x members, feedbacks_per_person received by every employee with a
+# mix of statuses and sentiments, plus optionally one "heavy" manager whose
+# history is much longer than everyone else's.
+
+PASSWORD = "bench-password"
+STATUSES = ["requested", "draft", "submitted", "acknowledged"]
+STATUS_WEIGHTS = [1, 1, 4, 4]
+SENTIMENTS = ["positive", "neutral", "negative"]
+TAGS = ["communication", "ownership", "delivery", "teamwork", "deadline", "quality"]
+WORDS = "clear concise proactive reliable thorough helpful curious patient focused calm".split()
+
+
+@dataclass
+class Org:
+    admin: str
+    managers: List[str] = field(default_factory=list)
+    teams: List[List[str]] = field(default_factory=list)
+    heavy_manager: str = ""
+
+    @property
+    def employees(self) -> List[str]:
+        return [email for team in self.teams for email in team]
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _feedback(rng: random.Random, creator: str, creator_role: str, employee: str, now: datetime) -> FeedbackDB:
+    status = rng.choices(STATUSES, STATUS_WEIGHTS)[0]
+    created_at = now - timedelta(days=rng.uniform(0, 365))
+    updated_at = created_at + timedelta(days=rng.uniform(0, 10))
+    requested = status == "requested"
+    return FeedbackDB(
+        created_by_email=creator,
+        created_by_role=creator_role,
+        is_anon=creator_role == "employee" and rng.random() < 0.3,
+        employee_email=employee,
+        strengths="" if requested else _text(rng, rng.randint(10, 80)),
+        areas_to_improve="" if requested else _text(rng, rng.randint(10, 80)),
+        sentiment=None if requested else rng.choice(SENTIMENTS),
+        tags=rng.sample(TAGS, rng.randint(0, 3)),
+        status=status,
+        requested_at=created_at if requested else None,
+        created_at=created_at,
+        updated_at=min(updated_at, now),
+        acknowledged_at=updated_at if status == "acknowledged" else None,
+    )
+
+
+async def generate_org(teams: int, members: int, feedbacks_per_person: int, heavy_feedbacks: int = 0, seed: int = 42) -> Org:
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    # one bcrypt hash shared by every synthetic user keeps generation fast
+    password_hashed = hash_password(PASSWORD)
+
+    org = Org(admin="admin@bench.test")
+    users = [UserDB(name="Bench Admin", email=org.admin, password_hashed=password_hashed, role="admin")]
+    team_docs = []
+    for t in range(teams):
+        manager = f"manager{t}@bench.test"
+        team = [f"employee{t}-{m}@bench.test" for m in range(members)]
+        org.managers.append(manager)
+        org.teams.append(team)
+        users.append(UserDB(name=f"Manager {t}", email=manager, password_hashed=password_hashed, role="manager"))
+        users.extend(UserDB(name=f"Employee {t} {m}", email=email, password_hashed=password_hashed, role="employee") for m, email in enumerate(team))
+        team_docs.append(TeamDB(manager_email=manager, member_emails=team, created_at=now, updated_at=now))
+
+    await UserDB.insert_many(users)
+    await TeamDB.insert_many(team_docs)
+
+    feedbacks = []
+    for manager, team in zip(org.managers, org.teams):
+        for employee in team:
+            for _ in range(feedbacks_per_person):
+                peers = [p for p in team if p != employee]
+                if peers and rng.random() < 0.5:
+                    feedbacks.append(_feedback(rng, rng.choice(peers), "employee", employee, now))
+                else:
+                    feedbacks.append(_feedback(rng, manager, "manager", employee, now))
+
+    if heavy_feedbacks and org.managers:
+        org.heavy_manager = org.managers[0]
+        for _ in range(heavy_feedbacks):
+            feedbacks.append(_feedback(rng, org.heavy_manager, "manager", rng.choice(org.teams[0]), now))
+
+    for start in range(0, len(feedbacks), 5000):
+        await FeedbackDB.insert_many(feedbacks[start:start + 5000])
+
+    await rebuild_rollups()
+    return org
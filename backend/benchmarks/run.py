@@ -0,0 +1,215 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+
+# app.utils.auth reads SECRET_KEY when it is imported, so set it before any app import
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+from pymongo import monitoring
+from app.core.database import init_db
+from app.core.metrics import mongo_listener
+from app.core.jobs import jobs
+from benchmarks.generator import PASSWORD, generate_org
+
+# Load benchmark: builds a synthetic org, drives app.main:app in-process over
+# the httpx ASGI transport and reports latency percentiles and Mongo
+# commands per request for the hot endpoints.
+#
+#   python -m benchmarks.run                      # local mongod at MONGO_URI
+#   python -m benchmarks.run --mock               # mongomock-motor (pip install, not in requirements.txt), no server
+#   python -m benchmarks.run --save-baseline benchmarks/baseline.json
+#   python -m benchmarks.run --compare benchmarks/baseline.json
+#
+# --compare exits 1 when any scenario's p95 or queries per request regresses
+# beyond --tolerance, so CI can gate on it. Query counts need a real mongod;
+# mongomock does not emit command events. The job workers don't run in the
+# background here: the queue is drained after each request with the counter
+# paused, so queries per request stay deterministic and jobs per request is
+# reported on its own.
+
+BENCH_DATABASE = "feedback_bench"
+
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.count = 0
+        self.paused = False
+
+    def started(self, event):
+        if not self.paused:
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+async def connect(mock: bool, counter: CommandCounter):
+    if mock:
+        from mongomock_motor import AsyncMongoMockClient
+        client = AsyncMongoMockClient()
+    else:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        uri = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+        client = AsyncIOMotorClient(uri, event_listeners=[mongo_listener, counter])
+        await client.drop_database(BENCH_DATABASE)
+
+    await init_db(client=client, database_name=BENCH_DATABASE)
+    return client
+
+
+async def measure(http, counter, name, make_request, iterations, count_queries):
+    latencies = []
+    queries = []
+    jobs_run = 0
+    errors = 0
+    for i in range(iterations):
+        counter.count = 0
+        start = time.perf_counter()
+        response = await make_request(http, i)
+        latencies.append(time.perf_counter() - start)
+        queries.append(counter.count)
+        if response.status_code >= 400:
+            errors += 1
+        counter.paused = True
+        try:
+            jobs_run += await jobs.drain()
+        finally:
+            counter.paused = False
+
+    return {
+        "scenario": name,
+        "iterations": iterations,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "queries_per_request": round(sum(queries) / len(queries), 2) if count_queries else None,
+        "jobs_per_request": round(jobs_run / iterations, 2),
+    }
+
+
+async def login(http, email):
+    response = await http.post("/user/login", json={"email": email, "password": PASSWORD})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def run(args):
+    import httpx
+    from app.main import app
+
+    counter = CommandCounter()
+    await connect(args.mock, counter)
+    org = await generate_org(args.teams, args.members, args.feedbacks, args.heavy, args.seed)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        employee = org.teams[0][0]
+        peer = org.teams[0][1] if len(org.teams[0]) > 1 else org.managers[0]
+        employee_auth = await login(http, employee)
+        manager_auth = await login(http, org.managers[-1])
+        heavy_auth = await login(http, org.heavy_manager or org.managers[0])
+        admin_auth = await login(http, org.admin)
+
+        def bulk_users(i):
+            return [
+                {"name": f"New Hire {i} {n}", "email": f"hire{i}-{n}@bench.test", "password": PASSWORD, "role": "employee"}
+                for n in range(args.bulk_size)
+            ]
+
+        scenarios = [
+            ("get_all employee", lambda h, i: h.get("/feedback/get-all", headers=employee_auth)),
+            ("get_all manager", lambda h, i: h.get("/feedback/get-all", headers=manager_auth)),
+            ("get_all heavy manager", lambda h, i: h.get("/feedback/get-all", headers=heavy_auth)),
+            ("sentiment-trends", lambda h, i: h.get("/dashboard/sentiment-trends", headers=heavy_auth)),
+            ("all-analytics", lambda h, i: h.get("/dashboard/all-analytics", headers=heavy_auth)),
+            ("create", lambda h, i: h.post("/feedback/create", json={
+                "feedbackId": "",
+                "created_by_email": employee,
+                "employee_email": peer,
+                "strengths": "Clear and reliable.",
+                "areas_to_improve": "Share updates earlier.",
+                "sentiment": "positive",
+                "tags": ["communication"],
+                "status": "submitted",
+                "is_anon": False,
+            })),
+            ("login", lambda h, i: h.post("/user/login", json={"email": employee, "password": PASSWORD})),
+            ("bulk-register", lambda h, i: h.post("/user/bulk-register", json=bulk_users(i), headers=admin_auth)),
+        ]
+
+        results = []
+        for name, make_request in scenarios:
+            iterations = args.bulk_iterations if name == "bulk-register" else args.iterations
+            result = await measure(http, counter, name, make_request, iterations, not args.mock)
+            results.append(result)
+            print(f"{name:24} p50 {result['p50_ms']:8.2f}ms  p95 {result['p95_ms']:8.2f}ms  "
+                  f"p99 {result['p99_ms']:8.2f}ms  queries {result['queries_per_request']}  "
+                  f"jobs {result['jobs_per_request']}  errors {result['errors']}")
+
+    return {
+        "org": {"teams": args.teams, "members": args.members, "feedbacks": args.feedbacks, "heavy": args.heavy},
+        "results": results,
+    }
+
+
+def compare(report, baseline, tolerance):
+    previous = {r["scenario"]: r for r in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        before = previous.get(result["scenario"])
+        if not before:
+            continue
+        if result["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{result['scenario']}: p95 {before['p95_ms']}ms -> {result['p95_ms']}ms")
+        if (result["queries_per_request"] is not None and before["queries_per_request"] is not None
+                and result["queries_per_request"] > before["queries_per_request"]):
+            regressions.append(f"{result['scenario']}: queries {before['queries_per_request']} -> {result['queries_per_request']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feedback API load benchmark")
+    parser.add_argument("--teams", type=int, default=10)
+    parser.add_argument("--members", type=int, default=8)
+    parser.add_argument("--feedbacks", type=int, default=10, help="feedbacks received per employee")
+    parser.add_argument("--heavy", type=int, default=2000, help="extra feedbacks written by one heavy manager")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--bulk-iterations", type=int, default=5)
+    parser.add_argument("--bulk-size", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mock", action="store_true", help="use mongomock-motor instead of a mongod")
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 slowdown, 0.25 = 25%%")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"baseline written to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
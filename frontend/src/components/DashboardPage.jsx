@@ -7,7 +7,7 @@ import FeedbackDashboard from "./dashboard/FeedbackDashboard";
 export default function Dashboard({onClose}) {
     const { user } = useContext(UserContext);
 
-    const [feedbackAnalytics, setFeedbackAnalytics] = useState([]);
+    const [feedbackAnalytics, setFeedbackAnalytics] = useState(null);
 
     useEffect(() => {
         async function fetchAnalytics() {
@@ -4,17 +4,16 @@ import { PieChart, Pie, Cell, BarChart, Bar, XAxis, YAxis, Tooltip, ResponsiveCo
 const COLORS = ["#00C49F", "#FFBB28", "#FF8042"];
 
 const FeedbackDashboard = ({feedbackAnalytics}) => {
-    const total = feedbackAnalytics.length;
-    const submitted = feedbackAnalytics.filter(f => ["submitted", "acknowledged"].includes(f.status)).length;
-    const draft = feedbackAnalytics.filter(f => f.status === "draft").length;
-    const requested = feedbackAnalytics.filter(f => f.status === "requested").length;
-    const acknowledged = feedbackAnalytics.filter(f => f.status === "acknowledged").length;
-    const sentimentCount = feedbackAnalytics.filter(f => f.sentiment && ["submitted", "acknowledged"].includes(f.status)).reduce((acc, item) => {
-      acc[item.sentiment] = (acc[item.sentiment] || 0) + 1;
-      return acc;
-    }, {});
-  
-    const sentimentData = Object.entries(sentimentCount).map(([key, value]) => ({
+    // counts arrive pre-aggregated from /dashboard/all-analytics
+    const status = feedbackAnalytics?.status || {};
+    const total = feedbackAnalytics?.total || 0;
+    const acknowledged = status.acknowledged || 0;
+    const submitted = (status.submitted || 0) + acknowledged;
+    const draft = status.draft || 0;
+    const requested = status.requested || 0;
+    const items = feedbackAnalytics?.items || [];
+
+    const sentimentData = Object.entries(feedbackAnalytics?.sentiment || {}).map(([key, value]) => ({
       name: key,
       value
     }));
@@ -81,7 +80,7 @@ const FeedbackDashboard = ({feedbackAnalytics}) => {
             <div className="max-h-28 overflow-scroll">
             <table className="w-full text-sm">
               <tbody>
-                {feedbackAnalytics.map(entry => (
+                {items.map(entry => (
                   <tr key={entry.id} className="border-b text-left">
                     <td className="py-2 w-1/5">{entry.employee_name}</td>
                     <td className="py-2 w-1/5">{entry.sentiment}</td>
@@ -8,7 +8,7 @@ import ActionButtons from "../components/ActionButtons";
 import NavBar from "../components/NavBar";
 import RequestForm from "../components/RequestForm";
 import Dashboard from "../components/DashboardPage";
-import { deleteFeedback, getFeedbackList } from "../services/feedback";
+import { deleteFeedback, getFeedbackList, subscribeFeedbackEvents } from "../services/feedback";
 
 const Home = () => {
     const [selectedFeedback, setSelectedFeedback] = useState(null);
@@ -19,11 +19,16 @@ const Home = () => {
     const [showDashboard, setShowDashboard] = useState(false);
     const [selectedPage, setSelectedPage] = useState("Home");
     const [feedbacks, setFeedbacks] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [error, setError] = useState("");
 
+    // set once the user has paged past the first page
+    const loadedMoreRef = useRef(false);
+
     const errorTimeoutRef = useRef();
 
-    const pollingRef = useRef();
+    const unsubscribeRef = useRef();
 
     useEffect(() => {
         if (errorTimeoutRef.current) {
@@ -47,32 +52,64 @@ const Home = () => {
         window.location.href = "/login";
     };
 
+    // refetch only the first page; pages the user already loaded are kept
+    // below it, minus anything that moved up
+    const refreshFirstPage = async () => {
+        const page = await getFeedbackList(user?.email);
+        if (!loadedMoreRef.current) {
+            setFeedbacks(page.items);
+            setNextCursor(page.next_cursor);
+            return;
+        }
+        const fresh = new Set(page.items.map((fb) => fb.id));
+        setFeedbacks((prev) => [...page.items, ...prev.filter((fb) => !fresh.has(fb.id))]);
+    };
+
+    const handleLoadMore = async () => {
+        if (!nextCursor || loadingMore) return;
+        setLoadingMore(true);
+        try {
+            const page = await getFeedbackList(user?.email, nextCursor);
+            loadedMoreRef.current = true;
+            setFeedbacks((prev) => {
+                const seen = new Set(prev.map((fb) => fb.id));
+                return [...prev, ...page.items.filter((fb) => !seen.has(fb.id))];
+            });
+            setNextCursor(page.next_cursor);
+        } catch (err) {
+            setError(err.message);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     useEffect(() => {
         async function fetchData() {
             try {
-                const data = await getFeedbackList(user?.email);
-                setFeedbacks(data);
+                await refreshFirstPage();
             } catch (err) {
                 setError(err.message);
             }
         }
 
-        if (selectedPage !== "Home") {
-            clearInterval(pollingRef.current);
-        } else {
+        if (selectedPage === "Home") {
+            loadedMoreRef.current = false;
             fetchData();
-            pollingRef.current = setInterval(() => {
-                fetchData();
-            }, 1000);
+            unsubscribeRef.current = subscribeFeedbackEvents(() => fetchData());
         }
+
+        return () => {
+            unsubscribeRef.current?.();
+            unsubscribeRef.current = null;
+        };
     }, [selectedPage]);
 
     const handleDelete = (id) => {
         async function deleteFB() {
             try {
                 await deleteFeedback(id);
-                const data = await getFeedbackList(user?.email);
-                setFeedbacks(data);
+                setFeedbacks((prev) => prev.filter((fb) => fb.id !== id));
+                await refreshFirstPage();
             } catch (err) {
                 setError(err.message);
             }
@@ -149,6 +186,17 @@ const Home = () => {
                                     setSelectedFeedback={setSelectedFeedback}
                                     setError={setError}
                                 />
+                                {nextCursor && (
+                                    <div className="flex justify-center mt-4">
+                                        <button
+                                            onClick={handleLoadMore}
+                                            disabled={loadingMore}
+                                            className="bg-[#5D4E6D] hover:bg-[#4A3D56] text-white font-medium py-2.5 px-4 rounded-lg transition-colors duration-200 shadow-sm disabled:opacity-50"
+                                        >
+                                            {loadingMore ? "Loading..." : "Load more"}
+                                        </button>
+                                    </div>
+                                )}
                             </div>
                             {user?.role === "employee" && (
                                 <div className="lg:w-[320px]">
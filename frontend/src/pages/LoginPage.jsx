@@ -19,6 +19,7 @@ export default function LoginPage({ setUser }) {
                 email: userData.email,
                 name: userData.name,
                 role: userData.role,
+                token: userData.access_token,
             };
             setUser(loggedInUser);
 
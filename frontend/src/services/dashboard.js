@@ -1,11 +1,13 @@
+import { authHeaders } from "../utils/auth";
+
 export async function getEmployeeList(email) {
-    const res = await fetch(`http://localhost:8000/dashboard/team-members?user_email=${email}`);
+    const res = await fetch(`http://localhost:8000/dashboard/team-members`, { headers: authHeaders() });
     if (!res.ok) throw new Error("Failed to fetch feedback");
     return res.json();
   }
 
   export async function getAnalyticsData(email) {
-    const res = await fetch(`http://localhost:8000/dashboard/all-analytics?user_email=${email}`);
+    const res = await fetch(`http://localhost:8000/dashboard/all-analytics`, { headers: authHeaders() });
     if (!res.ok) throw new Error("Failed to fetch feedback");
     return res.json();
   }
\ No newline at end of file
@@ -1,16 +1,34 @@
-export const getFeedbackList = async (email) => {
-  const res = await fetch(`http://127.0.0.1:8000/feedback/get-all?email=${email}`);
+import { authHeaders, getCurrentUser } from "../utils/auth";
+
+// one page per call; pass the previous page's next_cursor to load the next
+export const getFeedbackList = async (email, cursor = null) => {
+  const params = new URLSearchParams();
+  if (cursor) params.set("cursor", cursor);
+
+  const res = await fetch(`http://127.0.0.1:8000/feedback/get-all?${params}`, {
+    headers: authHeaders(),
+  });
 
   if (!res.ok) {
     throw new Error("Failed to fetch feedback");
   }
 
-  const data = await res.json();
-  return data;
+  return res.json();
 };
 
+// server-sent events replace polling: refetch only when something changed
+export function subscribeFeedbackEvents(onEvent) {
+  const token = getCurrentUser()?.token;
+  const params = new URLSearchParams(token ? { access_token: token } : {});
+  const source = new EventSource(`http://127.0.0.1:8000/feedback/events?${params}`);
+  const types = ["created", "requested", "acknowledged", "updated", "resync"];
+  const handler = (e) => onEvent(JSON.parse(e.data));
+  types.forEach((type) => source.addEventListener(type, handler));
+  return () => source.close();
+}
+
 export async function getFeedbackById(id, email) {
-  const res = await fetch(`http://localhost:8000/feedback/${id}?requestor_email=${email}`);
+  const res = await fetch(`http://localhost:8000/feedback/${id}`, { headers: authHeaders() });
   if (!res.ok) throw new Error("Failed to fetch feedback");
   return res.json();
 }
@@ -27,6 +45,7 @@ export async function submitFeedback(payload) {
     method: "POST",
     headers: {
       "Content-Type": "application/json",
+      ...authHeaders(),
     },
     body: JSON.stringify(payload),
   });
@@ -50,6 +69,7 @@ export async function requestFeedback(data) {
     method: "POST",
     headers: {
       "Content-Type": "application/json",
+      ...authHeaders(),
     },
     body: JSON.stringify(data),
   });
@@ -67,6 +87,7 @@ export async function acknowledge(email, feedbackId){
     method: "POST",
     headers: {
       "Content-Type": "application/json",
+      ...authHeaders(),
     },
     body: JSON.stringify({employee_email: email}),
   });
@@ -84,6 +105,7 @@ export async function deleteFeedback(feedbackId){
     method: "DELETE",
     headers: {
       "Content-Type": "application/json",
+      ...authHeaders(),
     }
   });
 
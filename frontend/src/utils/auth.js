@@ -1,4 +1,9 @@
 export function getCurrentUser(){
     const user = localStorage.getItem("user")
     return user? JSON.parse(user): null
-}
\ No newline at end of file
+}
+
+export function authHeaders(){
+    const token = getCurrentUser()?.token
+    return token ? { Authorization: `Bearer ${token}` } : {}
+}